@@ -2,28 +2,34 @@ let allLyrics = [];
 let currentResults = [];
 let selectedIndex = -1;
 
+// Index de recherche généré par generate_db.py (search/manifest.json, un shard par préfixe, documents d_<n>.json)
+const SEARCH_DIR = 'search/';
+let searchManifest = null;
+const shardCache = new Map();
+let searchSeq = 0;
+
 document.addEventListener('DOMContentLoaded', () => {
     const searchInput = document.getElementById('search-input');
     
     searchInput.disabled = true;
     searchInput.placeholder = "Chargement des paroles...";
 
-    fetch('database.json')
-        .then(response => response.json())
-        .then(data => {
-            allLyrics = data.map(item => {
-                let name = item.filename.replace('.lrc', '');
-                let parts = name.split(' - ');
-                return {
-                    ...item,
-                    title: parts[0] || name,
-                    artist: parts[1] || 'Artiste inconnu'
-                };
-            });
-            searchInput.disabled = false;
-            searchInput.placeholder = "Rechercher un titre ou un artiste...";
-            searchInput.focus();
+    const ready = () => {
+        searchInput.disabled = false;
+        searchInput.placeholder = "Rechercher un titre ou un artiste...";
+        searchInput.focus();
+    };
+
+    fetch(SEARCH_DIR + 'manifest.json')
+        .then(response => {
+            if (!response.ok) throw new Error(response.status);
+            return response.json();
+        })
+        .then(manifest => {
+            searchManifest = manifest;
+            ready();
         })
+        .catch(() => loadFullDatabase().then(ready))
         .catch(err => {
             console.error("Erreur chargement DB:", err);
             searchInput.placeholder = "Erreur de chargement.";
@@ -45,22 +51,121 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 });
 
-function handleSearch(query) {
-    const container = document.getElementById('results-container');
-    container.innerHTML = ''; 
-    selectedIndex = -1;
+// Repli quand l'index n'est pas disponible : chargement complet de database.json
+function loadFullDatabase() {
+    return fetch('database.json')
+        .then(response => response.json())
+        .then(data => {
+            allLyrics = data.map(item => {
+                // Titre/artiste fournis par generate_db.py (en-têtes [ti:]/[ar:]), sinon déduits du nom de fichier
+                let name = item.filename.replace('.lrc', '');
+                let parts = name.split(' - ');
+                return {
+                    ...item,
+                    title: item.title || parts[0] || name,
+                    artist: item.artist || parts[1] || 'Artiste inconnu'
+                };
+            });
+        });
+}
 
-    if (!query || query.trim().length < 1) {
-        currentResults = [];
-        return; 
+// Minuscules sans accents ni autres marques combinantes : doit rester identique à fold() dans generate_db.py
+function foldText(text) {
+    return text.normalize('NFKD').replace(/\p{M}/gu, '').toLowerCase();
+}
+
+function tokenize(text) {
+    return foldText(text).split(/[^\p{L}\p{N}]+/u).filter(Boolean);
+}
+
+// Fichiers de l'index (shards et paquets de documents), téléchargés une fois
+function loadIndexFile(name) {
+    if (!shardCache.has(name)) {
+        // Fichier inaccessible : aucun résultat (et nouvel essai à la frappe suivante)
+        const file = fetch(SEARCH_DIR + name)
+            .then(res => {
+                if (!res.ok) throw new Error(res.status);
+                return res.json();
+            })
+            .catch(err => {
+                console.error("Erreur chargement index:", err);
+                shardCache.delete(name);
+                return null;
+            });
+        shardCache.set(name, file);
     }
+    return shardCache.get(name);
+}
+
+function lowerBound(sorted, value) {
+    let lo = 0, hi = sorted.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (sorted[mid] < value) lo = mid + 1; else hi = mid;
+    }
+    return lo;
+}
+
+// Ids des documents dont un mot commence par `word` : dichotomie dans le seul shard concerné
+async function lookupWord(word) {
+    const matches = new Set();
+    const info = searchManifest.shards[word.slice(0, searchManifest.prefix)];
+    const shard = info ? await loadIndexFile(info.file) : null;
+    if (!shard) return matches;
+    for (let i = lowerBound(shard.tokens, word); i < shard.tokens.length && shard.tokens[i].startsWith(word); i++) {
+        for (const id of shard.postings[i]) matches.add(id);
+    }
+    return matches;
+}
+
+async function searchIndex(query) {
+    // Les mots plus courts que le préfixe des shards sont en cours de frappe : ignorés
+    const words = tokenize(query).filter(w => w.length >= searchManifest.prefix);
+    if (words.length === 0) return null;
 
+    const perWord = await Promise.all(words.map(lookupWord));
+    perWord.sort((a, b) => a.size - b.size);
+    const [smallest, ...others] = perWord;
+    const ids = [...smallest].filter(id => others.every(m => m.has(id))).sort((a, b) => a - b);
+
+    // Titre, artiste et fichier : seuls les paquets de documents des résultats sont téléchargés
+    const chunk = searchManifest.chunk;
+    const numbers = [...new Set(ids.map(id => Math.floor(id / chunk)))];
+    const docs = new Map(await Promise.all(numbers.map(async n => [n, await loadIndexFile(`d_${n}.json`)])));
+    return ids
+        .filter(id => docs.get(Math.floor(id / chunk)))
+        .map(id => {
+            const [title, artist, filename] = docs.get(Math.floor(id / chunk))[id % chunk];
+            return { title, artist, filename, path: `${searchManifest.folder}/${filename}` };
+        });
+}
+
+function searchFull(query) {
     const lowerQuery = query.toLowerCase();
-    currentResults = allLyrics.filter(file => 
+    return allLyrics.filter(file => 
         file.title.toLowerCase().includes(lowerQuery) || 
         file.artist.toLowerCase().includes(lowerQuery) ||
         file.filename.toLowerCase().includes(lowerQuery)
     );
+}
+
+async function handleSearch(query) {
+    const container = document.getElementById('results-container');
+    const seq = ++searchSeq;
+
+    let results = [];
+    if (query && query.trim().length >= 1) {
+        results = searchManifest ? await searchIndex(query) : searchFull(query);
+    }
+    if (seq !== searchSeq) return; // Une frappe plus récente a déjà relancé la recherche
+
+    container.innerHTML = ''; 
+    selectedIndex = -1;
+    currentResults = results || [];
+
+    if (!query || query.trim().length < 1 || results === null) {
+        return; 
+    }
 
     displayResults(currentResults);
 }
@@ -154,15 +259,53 @@ function formatLRCLines(text) {
     }).join('');
 }
 
+// Pack optionnel (generate_db.py --pack) : un seul fichier, lu par requête HTTP Range
+const PACK_TABLE = 'lyrics.pack.json';
+let packTable;
+let downloadUrl = null;
+
+function loadPackTable() {
+    if (packTable === undefined) {
+        packTable = fetch(PACK_TABLE)
+            .then(res => res.ok ? res.json() : null)
+            .catch(() => null);
+    }
+    return packTable;
+}
+
+// Renvoie { text, url } : url est le fichier lui-même, ou un lien local quand les paroles viennent du pack
+function fetchLyrics(path, filename) {
+    return loadPackTable().then(table => {
+        const entry = table && table.entries[filename];
+        if (!entry) {
+            return fetch(path).then(res => res.text()).then(text => ({ text, url: path }));
+        }
+        const [offset, length] = entry;
+        return fetch(table.pack, { headers: { Range: `bytes=${offset}-${offset + length - 1}` } })
+            .then(res => res.arrayBuffer().then(buf => res.status === 206 ? buf : buf.slice(offset, offset + length)))
+            .then(bytes => {
+                if (table.compression === 'deflate') {
+                    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'));
+                    return new Response(stream).text();
+                }
+                return new TextDecoder().decode(bytes);
+            })
+            .then(text => {
+                if (downloadUrl) URL.revokeObjectURL(downloadUrl);
+                downloadUrl = URL.createObjectURL(new Blob([text], { type: 'text/plain' }));
+                return { text, url: downloadUrl };
+            });
+    });
+}
+
 function openFileModal(path, filename) {
-    fetch(path)
-        .then(res => res.text())
-        .then(text => {
+    fetchLyrics(path, filename)
+        .then(({ text, url }) => {
             document.getElementById('modal-title').innerText = filename;
             document.getElementById('modal-body').innerHTML = formatLRCLines(text);
             
             const downloadBtn = document.getElementById('download-btn');
-            downloadBtn.href = path;
+            downloadBtn.href = url;
             downloadBtn.download = filename;
 
             const copyBtn = document.getElementById('copy-btn');
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+import asyncio
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401 (HTTP/2 optionnel : pip install httpx[http2])
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class AsyncLyricsEngine:
+    """Moteur de téléchargement asyncio (httpx).
+
+    Une seule boucle d'événements gère `concurrency` requêtes simultanées, avec un
+    pool de connexions keep-alive de la même taille (HTTP/2 si disponible).
+    Les requêtes passent par le même RateController que le moteur à threads.
+    La conversion et l'écriture restent celles de AppleMusicLyrics.finish_song,
+    exécutées hors de la boucle.
+    """
+
+    def __init__(self, app, concurrency=10):
+        self.app = app
+        self.concurrency = max(1, concurrency)
+
+    @staticmethod
+    def available():
+        return httpx is not None
+
+    def run(self, songs, on_result):
+        """Traite les chansons (itérable, lu au fur et à mesure) ; on_result(succès, message) est appelé pour chacune."""
+        asyncio.run(self._run(songs, on_result))
+
+    async def _run(self, songs, on_result):
+        limits = httpx.Limits(max_connections=self.concurrency,
+                              max_keepalive_connections=self.concurrency,
+                              keepalive_expiry=30)
+        headers = dict(self.app.session.headers)
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async with httpx.AsyncClient(headers=headers, limits=limits, http2=HTTP2_AVAILABLE, timeout=30) as client:
+            workers = [asyncio.create_task(self._worker(client, queue, on_result)) for _ in range(self.concurrency)]
+            # Les chansons peuvent venir d'un générateur qui fait des requêtes (pagination) :
+            # il est lu hors de la boucle pour ne pas bloquer les workers
+            songs = iter(songs)
+            while True:
+                song = await asyncio.to_thread(next, songs, None)
+                if song is None:
+                    break
+                await queue.put(song)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+
+    async def _worker(self, client, queue, on_result):
+        while True:
+            song = await queue.get()
+            if song is None:
+                return
+            try:
+                with self.app.metrics.timer('process_song'):
+                    ttml, source = await self._get_lyrics_ttml(client, song['id'], song.get('lyricsHint'),
+                                                               song.get('lyricsCache'))
+                    success, message = await asyncio.to_thread(self.app.finish_song, song, ttml, source)
+            except Exception as exc:
+                success, message = False, f"❌ Exception générée: {exc}"
+            on_result(success, message)
+
+    async def _send(self, client, url):
+        metrics = self.app.metrics
+        try:
+            with metrics.timer('http_request'):
+                res = await client.get(url)
+        except Exception:
+            metrics.http(None)
+            raise
+        metrics.http(res.status_code, len(res.content))
+        return res
+
+    async def _get(self, client, url):
+        token = self.app.bearer_token
+        res = await self.app.rate.request_async(lambda: self._send(client, url))
+        # 401 : token web expiré, renouvelé une fois (partagé avec le reste de l'application)
+        if res.status_code == 401 and await asyncio.to_thread(self.app.refresh_bearer_token, token):
+            client.headers['Authorization'] = f'Bearer {self.app.bearer_token}'
+            res = await self.app.rate.request_async(lambda: self._send(client, url))
+        return res
+
+    async def _get_lyrics_ttml(self, client, song_id, hint=None, cached=None):
+        """Équivalent asynchrone de AppleMusicLyrics.get_lyrics_ttml (même cache, mêmes endpoints)."""
+        if cached:
+            return cached
+        if cached is None:
+            # Le cache (SQLite) est lu et écrit hors de la boucle, comme finish_song
+            hit, ttml, source = await asyncio.to_thread(self.app.cached_lyrics, song_id)
+            if hit:
+                return ttml, source
+
+        definitive = True
+        for url, source in self.app.lyrics_endpoints(song_id, hint):
+            try:
+                with self.app.metrics.timer('lyrics_attempt'):
+                    res = await self._get(client, url)
+                ttml, ok = self.app.parse_lyrics_response(res.status_code, res.json() if res.status_code == 200 else None)
+            except Exception:
+                ttml, ok = None, False
+            self.app.metrics.inc(f"lyrics_{source.lower()}_{'found' if ttml else 'missing'}")
+            if ttml:
+                await asyncio.to_thread(self.app.cache_lyrics, song_id, ttml, source, True)
+                return ttml, source
+            definitive = definitive and ok
+
+        await asyncio.to_thread(self.app.cache_lyrics, song_id, None, None, definitive)
+        return None, None
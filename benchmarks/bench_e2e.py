@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Benchmark de bout en bout de apple_lyrics.py contre le serveur local fake_apple_api.py.
+
+Lance le serveur (latence, 429, 5xx et chansons sans paroles réglables), puis
+apple_lyrics.py dans chaque mode (library, artist, batch, charts), pour chaque moteur
+et chaque nombre de threads, dans un dossier temporaire (token factice, ni cache ni archive).
+Pour chaque run : chansons/s, latence par chanson p50/p99 (calculées sur la durée exacte de
+chaque chanson, --metrics-samples), temps CPU et mémoire maximale du processus, requêtes
+servies et réponses 429/5xx (réessayées).
+
+    python benchmarks/bench_e2e.py --songs 2000 --threads 10 50 --latency 80
+    python benchmarks/bench_e2e.py --modes library --engines threads staged async --rate-limit 0.05
+"""
+import argparse
+import base64
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+MODES = ('library', 'artist', 'batch', 'charts')
+
+
+def fake_token():
+    """JWT factice valide jusqu'en 2100 : apple_lyrics.py ne va pas chercher de token sur le site."""
+    def part(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip('=')
+    return f"{part({'alg': 'ES256'})}.{part({'exp': 4102444800})}.signature"
+
+
+def quantile(samples, q):
+    """Quantile q (rang le plus proche) d'une liste de durées."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def is_retried_error(key):
+    """Clé '/endpoint statut' de /_stats d'une réponse 429 ou 5xx."""
+    status = key.rsplit(' ', 1)[-1]
+    return status == '429' or status.startswith('5')
+
+
+def server_stats(base):
+    with urllib.request.urlopen(f"{base}/_stats") as res:
+        return json.load(res)
+
+
+def run(base, mode, engine, threads, songs, tmp):
+    """Un run de apple_lyrics.py ; retourne ses mesures."""
+    work = tempfile.mkdtemp(dir=tmp)
+    with open(os.path.join(work, 'bearer_token.json'), 'w') as f:
+        json.dump({'token': fake_token()}, f)
+    with open(os.path.join(work, 'user_token.txt'), 'w') as f:
+        f.write("bench")
+    args = {
+        'library': ['--library'],
+        'artist': ['--artist', 'Artiste 0', '--auto'],
+        'batch': ['--batch', os.path.join(work, 'batch.txt')],
+        'charts': ['--charts'],
+    }[mode]
+    if mode == 'batch':
+        with open(os.path.join(work, 'batch.txt'), 'w', encoding='utf-8') as f:
+            f.writelines(f"Chanson {i} Artiste\n" for i in range(0, songs, 2))
+
+    metrics_path = os.path.join(work, 'metrics.json')
+    command = [sys.executable, os.path.join(ROOT, 'apple_lyrics.py'), *args, '-o', os.path.join(work, 'out'),
+               '-e', engine, '-t', str(threads), '--no-cache', '--metrics', metrics_path, '--metrics-samples']
+    env = dict(os.environ, APPLE_MUSIC_API_BASE=base, PYTHONIOENCODING='utf-8')
+    before = server_stats(base)
+    start = time.perf_counter()
+    with open(os.path.join(work, 'output.txt'), 'w', encoding='utf-8') as log:
+        process = subprocess.Popen(command, cwd=work, env=env, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - start
+    after = server_stats(base)
+
+    if process.returncode != 0 or not os.path.exists(metrics_path):
+        return {'error': f"code {process.returncode}, voir {os.path.join(work, 'output.txt')}"}
+    with open(metrics_path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    per_song = report['phases'].get('fetch_song' if engine == 'staged' else 'process_song', {'count': 0, 'samples': []})
+    requests = {k: after[k] - before.get(k, 0) for k in after if after[k] != before.get(k, 0)}
+    return {
+        'songs': per_song['count'],
+        'songs_per_s': per_song['count'] / wall if wall else 0.0,
+        'p50': quantile(per_song['samples'], 0.5),
+        'p99': quantile(per_song['samples'], 0.99),
+        'cpu': usage.ru_utime + usage.ru_stime,
+        'rss_mb': usage.ru_maxrss / 1024,  # Ko sous Linux
+        'wall': wall,
+        'requests': sum(requests.values()),
+        'errors_429_5xx': sum(n for k, n in requests.items() if is_retried_error(k)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de bout en bout contre un serveur local")
+    parser.add_argument("--modes", nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument("--engines", nargs='+', choices=["threads", "async", "staged"], default=["threads"])
+    parser.add_argument("--threads", nargs='+', type=int, default=[10, 50])
+    parser.add_argument("--songs", type=int, default=2000, help="Taille de la bibliothèque et du catalogue")
+    parser.add_argument("--latency", type=float, default=50.0, help="Latence moyenne du serveur (ms)")
+    parser.add_argument("--jitter", type=float, default=20.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Proportion de réponses 429")
+    parser.add_argument("--server-errors", type=float, default=0.0, help="Proportion de réponses 500")
+    parser.add_argument("--missing", type=float, default=0.2, help="Proportion de chansons sans paroles")
+    parser.add_argument("--json", metavar="FICHIER", help="Écrire aussi les résultats en JSON")
+    args = parser.parse_args()
+
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, 'fake_apple_api.py'), '--port', '0', '--songs', str(args.songs),
+         '--latency', str(args.latency), '--jitter', str(args.jitter), '--rate-limit', str(args.rate_limit),
+         '--server-errors', str(args.server_errors), '--missing', str(args.missing)],
+        stdout=subprocess.PIPE, text=True)
+    base = server.stdout.readline().strip()
+    results = []
+    try:
+        print(f"Serveur {base} : {args.songs} chansons, latence {args.latency:.0f}±{args.jitter:.0f} ms, "
+              f"429 {args.rate_limit:.0%}, 5xx {args.server_errors:.0%}, sans paroles {args.missing:.0%}\n")
+        print(f"{'mode':8s} {'moteur':8s} {'threads':>7s} {'chansons':>8s} {'ch/s':>7s} {'p50':>7s} {'p99':>7s} "
+              f"{'CPU s':>6s} {'Mo':>6s} {'requêtes':>8s} {'429/5xx':>7s}")
+        with tempfile.TemporaryDirectory() as tmp:
+            for mode in args.modes:
+                for engine in args.engines:
+                    for threads in args.threads:
+                        r = run(base, mode, engine, threads, args.songs, tmp)
+                        results.append(dict(r, mode=mode, engine=engine, threads=threads))
+                        if 'error' in r:
+                            print(f"{mode:8s} {engine:8s} {threads:7d}  ❌ {r['error']}")
+                            continue
+                        print(f"{mode:8s} {engine:8s} {threads:7d} {r['songs']:8d} {r['songs_per_s']:7.1f} "
+                              f"{r['p50'] * 1000:5.0f}ms {r['p99'] * 1000:5.0f}ms {r['cpu']:6.1f} "
+                              f"{r['rss_mb']:6.0f} {r['requests']:8d} {r['errors_429_5xx']:7d}")
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 1 if any('error' in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Benchmark des moteurs sur la reconversion d'un corpus en cache (aucune requête réseau).
+
+Un cache de paroles temporaire est rempli de TTML synthétisés à partir de lyrics/
+(voir bench_ttml.py), puis chaque moteur reconvertit et écrit toutes les chansons
+dans un dossier temporaire. Les fichiers produits doivent être identiques d'un moteur à l'autre.
+
+    python benchmarks/bench_engines.py --songs 5000 --threads 10 --convert-workers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from apple_lyrics import STOREFRONT, AppleMusicLyrics  # noqa: E402
+from bench_ttml import corpus_from_lyrics  # noqa: E402
+from lyrics_cache import LyricsCache  # noqa: E402
+from staged_engine import StagedLyricsEngine  # noqa: E402
+from concurrent.futures import ThreadPoolExecutor  # noqa: E402
+
+
+def run_threads(app, songs, threads, on_result):
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for success, message in executor.map(app.process_song, songs):
+            on_result(success, message)
+
+
+def run_staged(app, songs, threads, on_result, convert_workers=None):
+    StagedLyricsEngine(app, threads, convert_workers).run(songs, on_result)
+
+
+def bench(name, runner, cache, songs, threads, tmp):
+    output = os.path.join(tmp, name)
+    app = AppleMusicLyrics(output_dir=output, cache=cache, pool_size=threads, offline=True)
+    done = []
+    start = time.perf_counter()
+    runner(app, songs, threads, lambda success, message: done.append(success))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<8} {len(songs) / elapsed:8.0f} chansons/s  ({elapsed:.2f}s, {sum(done)}/{len(songs)} écrites)")
+    contents = {}
+    for n in os.listdir(output):
+        with open(os.path.join(output, n), 'rb') as f:
+            contents[n] = f.read()
+    return elapsed, contents
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark threads vs staged (reconversion depuis le cache)")
+    parser.add_argument("--songs", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=10)
+    parser.add_argument("--convert-workers", type=int, help="Processus de conversion (défaut: nombre de cœurs)")
+    args = parser.parse_args()
+
+    docs = corpus_from_lyrics(os.path.join(ROOT, 'lyrics'), 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LyricsCache(os.path.join(tmp, 'cache.db'))
+        songs = []
+        for i in range(args.songs):
+            song_id = str(100000 + i)
+            cache.put(song_id, STOREFRONT, docs[i % len(docs)], 'Syllable')
+            songs.append({'id': song_id, 'attributes': {'name': f"Chanson {i}", 'artistName': "Artiste"}})
+
+        threads_time, threads_files = bench("threads", run_threads, cache, songs, args.threads, tmp)
+        staged_time, staged_files = bench(
+            "staged", lambda *a: run_staged(*a, convert_workers=args.convert_workers), cache, songs, args.threads, tmp)
+        cache.close()
+
+    same = threads_files == staged_files
+    print(f"Gain : x{threads_time / staged_time:.2f} ({os.cpu_count()} cœurs). "
+          f"Fichiers {'identiques' if same else 'DIFFÉRENTS'} entre les moteurs.")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
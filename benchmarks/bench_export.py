@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Benchmark de l'export hors ligne (lyrics_export) depuis une archive TTML.
+
+Remplit une archive temporaire de TTML synthétisés à partir de lyrics/ (voir bench_ttml.py),
+l'exporte dans tous les formats avec 1 puis N processus, et vérifie que l'export LRC est
+identique à ce que produit le téléchargement (en-tête + ttml_to_lrc).
+
+    python benchmarks/bench_export.py --songs 20000 --jobs 8
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_ttml import corpus_from_lyrics  # noqa: E402
+from output_index import lrc_header, safe_filename  # noqa: E402
+from ttml_archive import TtmlArchive  # noqa: E402
+from ttml_convert import ttml_to_lrc  # noqa: E402
+
+
+def folder_size(folder):
+    return sum(os.path.getsize(os.path.join(d, n)) for d, _, names in os.walk(folder) for n in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'export hors ligne")
+    parser.add_argument("--songs", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    docs = corpus_from_lyrics(os.path.join(ROOT, 'lyrics'), 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'archive.db')
+        archive = TtmlArchive(path)
+        raw = 0
+        for i in range(args.songs):
+            ttml = docs[i % len(docs)]
+            raw += len(ttml.encode('utf-8'))
+            archive.put({'id': str(i), 'attributes': {'name': f"Chanson {i}", 'artistName': "Artiste"}}, 'fr', ttml, 'Syllable')
+        count, size = archive.stats()
+        archive.close()
+        print(f"Archive : {count} TTML, {raw / 1e6:.1f} Mo bruts -> {size / 1e6:.1f} Mo compressés (x{raw / size:.1f})")
+
+        for jobs in sorted({1, args.jobs}):
+            out = os.path.join(tmp, f"out{jobs}")
+            start = time.perf_counter()
+            subprocess.run([sys.executable, os.path.join(ROOT, 'lyrics_export.py'), '--archive', path, '-o', out,
+                            '-j', str(jobs), '-F', 'lrc', 'plain', 'srt', 'vtt', 'json'],
+                           check=True, stdout=subprocess.DEVNULL)
+            elapsed = time.perf_counter() - start
+            print(f"{jobs} processus : {args.songs / elapsed:7.0f} chansons/s, 5 formats, "
+                  f"{folder_size(out) / elapsed / 1e6:.1f} Mo/s écrits ({elapsed:.1f}s)")
+
+        mismatches = 0
+        for i in range(args.songs):
+            name = safe_filename(f"Chanson {i}", "Artiste")
+            with open(os.path.join(out, 'lrc', name), encoding='utf-8', newline='') as f:
+                if f.read() != lrc_header(f"Chanson {i}", "Artiste") + ttml_to_lrc(docs[i % len(docs)])[0]:
+                    mismatches += 1
+        print(f"Export LRC : {mismatches} fichiers différents du téléchargement")
+        return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Benchmark et vérification de l'index de recherche titre/artiste (generate_db.build_search_index).
+
+Construit l'index d'un catalogue synthétique dans un dossier temporaire, mesure le temps
+de construction et la taille des shards et des paquets de documents, vérifie le format (tokens
+triés, postings alignés, chaque document écrit une seule fois) et compare la recherche par
+préfixe à un parcours complet.
+
+    python benchmarks/bench_index.py --docs 50000
+"""
+import argparse
+import bisect
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import generate_db  # noqa: E402
+
+SYLLABLES = ["ré", "sis", "te", "mon", "fils", "ba", "tail", "le", "feel", "ing", "gall", "fran", "ce",
+             "é", "lo", "ï", "ka", "ra", "o", "ke", "nuit", "jour", "cœur", "amour", "l'", "été", "ça"]
+
+
+def synthetic_entries(count, seed=1):
+    rng = random.Random(seed)
+
+    def words(n):
+        return " ".join("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))) for _ in range(n))
+
+    entries = []
+    for i in range(count):
+        title, artist = words(rng.randint(1, 4)).capitalize(), words(rng.randint(1, 2)).title()
+        entries.append({"filename": f"{title} - {artist} ({i}).lrc", "title": title, "artist": artist})
+    return sorted(entries, key=lambda e: e["filename"])
+
+
+def doc_files(manifest):
+    return [f"d_{n}.json" for n in range(-(-manifest["docs"] // manifest["chunk"]))]
+
+
+def check_format(folder, manifest, entries):
+    """Vérifie la structure de chaque shard et des paquets de documents. Lève AssertionError en cas d'écart."""
+    assert manifest["version"] == generate_db.INDEX_VERSION and manifest["docs"] == len(entries)
+    for key, info in manifest["shards"].items():
+        with open(os.path.join(folder, info["file"]), encoding="utf-8") as f:
+            shard = json.load(f)
+        tokens = shard["tokens"]
+        assert tokens == sorted(tokens), key
+        assert len(tokens) == len(shard["postings"]) == info["tokens"], key
+        assert all(t[:manifest["prefix"]] == key and len(t) >= manifest["prefix"] for t in tokens), key
+        for ids in shard["postings"]:
+            assert ids == sorted(ids)
+            assert all(0 <= i < len(entries) for i in ids)
+        assert len({i for ids in shard["postings"] for i in ids}) == info["docs"], key
+
+    docs = []
+    for name in doc_files(manifest):
+        with open(os.path.join(folder, name), encoding="utf-8") as f:
+            docs.extend(json.load(f))
+    assert docs == [[e["title"], e["artist"], e["filename"]] for e in entries]
+
+
+def lookup(folder, manifest, query):
+    """Même algorithme que searchIndex() dans app.js."""
+    words = [w for w in generate_db.tokenize(query) if len(w) >= manifest["prefix"]]
+    if not words:
+        return None
+    result = None
+    for word in words:
+        info = manifest["shards"].get(word[:manifest["prefix"]])
+        found = set()
+        if info:
+            with open(os.path.join(folder, info["file"]), encoding="utf-8") as f:
+                shard = json.load(f)
+            i = bisect.bisect_left(shard["tokens"], word)
+            while i < len(shard["tokens"]) and shard["tokens"][i].startswith(word):
+                found.update(shard["postings"][i])
+                i += 1
+        result = found if result is None else result & found
+    return sorted(result)
+
+
+def brute_force(entries, query):
+    words = [w for w in generate_db.tokenize(query) if len(w) >= 2]
+    return [i for i, e in enumerate(entries)
+            if all(any(t.startswith(w) for t in generate_db.tokenize(f"{e['title']} {e['artist']}")) for w in words)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'index de recherche")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    entries = synthetic_entries(args.docs)
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        manifest = generate_db.build_search_index(entries, folder)
+        build_time = time.perf_counter() - start
+
+        sizes = sorted(os.path.getsize(os.path.join(folder, i["file"])) for i in manifest["shards"].values())
+        docs_size = sum(os.path.getsize(os.path.join(folder, name)) for name in doc_files(manifest))
+        print(f"{args.docs} documents indexés en {build_time:.2f}s : {len(sizes)} shards, {sum(sizes) / 1e6:.1f} Mo, "
+              f"documents {docs_size / 1e6:.1f} Mo ({len(doc_files(manifest))} paquets)")
+        print(f"Taille des shards : médiane {sizes[len(sizes) // 2] / 1e3:.1f} Ko, "
+              f"p95 {sizes[int(len(sizes) * 0.95)] / 1e3:.1f} Ko, max {sizes[-1] / 1e3:.1f} Ko "
+              f"(database.json complet : ~{len(json.dumps(entries, ensure_ascii=False)) / 1e6:.1f} Mo)")
+
+        check_format(folder, manifest, entries)
+        print("Format : OK")
+
+        rng = random.Random(2)
+        mismatches = 0
+        for _ in range(args.queries):
+            e = rng.choice(entries)
+            words = generate_db.tokenize(f"{e['title']} {e['artist']}")
+            query = " ".join(w[:rng.randint(2, max(2, len(w)))] for w in rng.sample(words, min(2, len(words))))
+            if lookup(folder, manifest, query) not in (brute_force(entries, query), None):
+                mismatches += 1
+        print(f"Recherche : {mismatches} écarts sur {args.queries} requêtes par rapport au parcours complet")
+        assert lookup(folder, manifest, "resiste") == lookup(folder, manifest, "Résiste")
+        return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Benchmark du mode interactif (recherche puis choix) contre le serveur local fake_apple_api.py.
+
+Pilote apple_lyrics.py comme un utilisateur : une recherche, un temps de lecture de la liste
+(--think), un choix parmi les premiers résultats ; une recherche sur trois est répétée.
+Compare --prefetch 0 (paroles téléchargées après le choix) et --prefetch N : latence des
+recherches (nouvelles et répétées) et du choix, préchargements servis et annulés (encore en cours
+au moment du choix).
+
+    python benchmarks/bench_interactive.py --lookups 30 --latency 150
+    python benchmarks/bench_interactive.py --prefetch 0 3 5 --think 0.2
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+from bench_e2e import fake_token  # noqa: E402
+
+
+def read_until(process, marker):
+    """Lit la sortie jusqu'à marker (les invites de input() ne finissent pas par un retour à la ligne)."""
+    buffer = ''
+    while marker not in buffer:
+        char = process.stdout.read(1)
+        if not char:
+            raise RuntimeError(f"apple_lyrics.py s'est arrêté :\n{buffer}")
+        buffer += char
+    return buffer
+
+
+def run(base, prefetch, lookups, think, songs, seed, tmp):
+    """Une session interactive ; retourne les latences (s) des recherches nouvelles, répétées, des choix, et les compteurs."""
+    work = tempfile.mkdtemp(dir=tmp)
+    with open(os.path.join(work, 'bearer_token.json'), 'w') as f:
+        json.dump({'token': fake_token()}, f)
+    with open(os.path.join(work, 'user_token.txt'), 'w') as f:
+        f.write("bench")
+    metrics_path = os.path.join(work, 'metrics.json')
+    env = dict(os.environ, APPLE_MUSIC_API_BASE=base, PYTHONIOENCODING='utf-8', PYTHONUNBUFFERED='1')
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'apple_lyrics.py'), '-o', os.path.join(work, 'out'), '--no-cache',
+         '--prefetch', str(prefetch), '--metrics', metrics_path],
+        cwd=work, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, encoding='utf-8')
+
+    rng = random.Random(seed)  # Mêmes recherches et mêmes choix d'un run à l'autre
+    searches, repeated, choices, history = [], [], [], []
+    read_until(process, "Recherche")
+    for i in range(lookups):
+        again = bool(history) and i % 3 == 2
+        if again:
+            query = rng.choice(history).upper()  # Recherche répétée (casse différente)
+        else:
+            query = f"Chanson {rng.randrange(songs - 10)}"
+            history.append(query)
+        start = time.perf_counter()
+        process.stdin.write(query + "\n")
+        process.stdin.flush()
+        read_until(process, "Choix")
+        (repeated if again else searches).append(time.perf_counter() - start)
+
+        time.sleep(think)
+        start = time.perf_counter()
+        process.stdin.write(f"{rng.choice([1, 1, 2, 3])}\n")
+        process.stdin.flush()
+        read_until(process, "Recherche")
+        choices.append(time.perf_counter() - start)
+    process.stdin.write("q\n")
+    process.stdin.flush()
+    process.wait()
+    with open(metrics_path, 'r', encoding='utf-8') as f:
+        counters = json.load(f).get('counters', {})
+    return searches, repeated, choices, counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du mode interactif contre un serveur local")
+    parser.add_argument("--prefetch", nargs='+', type=int, default=[0, 3])
+    parser.add_argument("--lookups", type=int, default=30, help="Recherches par session")
+    parser.add_argument("--think", type=float, default=0.5, help="Temps de lecture de la liste avant le choix (s)")
+    parser.add_argument("--songs", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=150.0, help="Latence moyenne du serveur (ms)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, 'fake_apple_api.py'), '--port', '0', '--songs', str(args.songs),
+         '--latency', str(args.latency)],
+        stdout=subprocess.PIPE, text=True)
+    base = server.stdout.readline().strip()
+    try:
+        print(f"Serveur {base} : latence {args.latency:.0f} ms, {args.lookups} recherches, lecture {args.think}s\n")
+        print(f"{'prefetch':>8s} {'recherche méd.':>14s} {'répétée méd.':>12s} {'choix méd.':>10s} {'max':>7s} "
+              f"{'servis':>6s} {'annulés':>7s}")
+        with tempfile.TemporaryDirectory() as tmp:
+            for prefetch in args.prefetch:
+                searches, repeated, choices, counters = run(base, prefetch, args.lookups, args.think, args.songs,
+                                                            args.seed, tmp)
+                print(f"{prefetch:8d} {statistics.median(searches) * 1000:12.0f}ms "
+                      f"{statistics.median(repeated or [0]) * 1000:10.0f}ms "
+                      f"{statistics.median(choices) * 1000:8.0f}ms {max(choices) * 1000:5.0f}ms "
+                      f"{counters.get('prefetch_used', 0):6d} {counters.get('prefetch_dropped', 0):7d}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
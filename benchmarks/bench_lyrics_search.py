@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Benchmark et vérification de l'index plein texte des paroles (generate_db.build_lines_index + lyrics_search).
+
+Écrit un corpus synthétique de fichiers .lrc dans un dossier temporaire (par défaut
+2 000 fichiers x 60 lignes = 120 000 lignes), construit l'index, mesure sa taille et
+la latence des requêtes (première requête et requêtes suivantes), puis compare les
+résultats à un parcours complet des fichiers. Vérifie aussi "on t'organise" sur lyrics/.
+
+    python benchmarks/bench_lyrics_search.py --files 5000 --lines 60
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import generate_db  # noqa: E402
+from lyrics_search import LyricsSearch  # noqa: E402
+
+WORDS = ("si on t'organise une vie bien dirigée où tu oublieras vite résiste prouve que tu existes "
+         "cherche ton bonheur partout va refuse ce monde égoïste i got a feeling that tonight's gonna be "
+         "good night mon fils ma bataille fallait pas qu'elle s'en aille la la la oh yeah").split()
+
+
+def write_corpus(folder, files, lines, seed=1):
+    rng = random.Random(seed)
+    entries = []
+    for i in range(files):
+        name = f"Chanson {i:06d} - Artiste {i % 97}.lrc"
+        rows = [f"[ti:Chanson {i:06d}]", f"[ar:Artiste {i % 97}]", "[offset:+0]"]
+        for n in range(lines):
+            m, s = divmod(n * 3.5, 60)
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 9)))
+            rows.append(f"[{int(m):02d}:{s:05.2f}]v1:{text}")
+        with open(os.path.join(folder, name), 'w', encoding='utf-8') as f:
+            f.write("\n".join(rows))
+        entries.append({"filename": name})
+    return entries
+
+
+def brute_force(folder, entries, query):
+    words = generate_db.tokenize(query)
+    found = []
+    for entry in entries:
+        with open(os.path.join(folder, entry['filename']), encoding='utf-8') as f:
+            for number, tag, text in generate_db.parse_lrc_lines(f.read()):
+                if LyricsSearch._contains(generate_db.tokenize(text), words, len(words[-1]) >= generate_db.LINES_PREFIX):
+                    found.append((entry['filename'], number, tag))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'index plein texte des paroles")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--lines", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lyrics = os.path.join(tmp, 'lyrics')
+        index_dir = os.path.join(tmp, 'lines')
+        os.makedirs(lyrics)
+        entries = write_corpus(lyrics, args.files, args.lines)
+
+        start = time.perf_counter()
+        manifest = generate_db.build_lines_index(entries, lyrics, index_dir)
+        build_time = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(index_dir, n)) for n in os.listdir(index_dir))
+        print(f"{manifest['lines']} lignes ({args.files} fichiers) indexées en {build_time:.2f}s : "
+              f"{len(manifest['shards'])} shards de tokens, {size / 1e6:.1f} Mo au total")
+
+        rng = random.Random(2)
+        queries = [" ".join(rng.sample(WORDS, 1) + [w[:rng.randint(3, max(3, len(w)))] for w in rng.sample(WORDS, 1)])
+                   for _ in range(args.queries)]
+        queries.append("on t'organise")
+
+        index = LyricsSearch(index_dir)
+        cold = time.perf_counter()
+        index.search(queries[0], limit=20)
+        cold = time.perf_counter() - cold
+        warm = time.perf_counter()
+        for q in queries:
+            index.search(q, limit=20)
+        warm = (time.perf_counter() - warm) / len(queries)
+        print(f"Requête (20 résultats max) : première {cold * 1e3:.1f} ms, suivantes {warm * 1e3:.1f} ms en moyenne")
+
+        mismatches = 0
+        for q in queries[:10]:
+            got = [(r['filename'], r['line'], r['time']) for r in LyricsSearch(index_dir).search(q)]
+            if got != brute_force(lyrics, entries, q):
+                mismatches += 1
+        print(f"Résultats : {mismatches} écarts sur 10 requêtes par rapport au parcours complet")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        real = [{"filename": n} for n in sorted(os.listdir(os.path.join(ROOT, 'lyrics'))) if n.endswith('.lrc')]
+        generate_db.build_lines_index(real, os.path.join(ROOT, 'lyrics'), tmp)
+        hit = LyricsSearch(tmp).search("on t'organise")
+        ok = any(r['filename'].startswith("Résiste") for r in hit)
+        print(f"\"on t'organise\" : {hit[0]['filename']} [{hit[0]['time']}]" if ok else "\"on t'organise\" : introuvable")
+
+    return 1 if mismatches or not ok else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
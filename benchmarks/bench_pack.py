@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Benchmark du pack de paroles (lyrics_pack) : lecture d'un pack projeté en mémoire vs un fichier par chanson.
+
+Écrit un corpus synthétique de .lrc (copies des fichiers de lyrics/) dans un dossier
+temporaire, construit le pack (brut et compressé), vérifie que chaque entrée est
+identique au fichier d'origine, puis mesure la lecture de toutes les entrées dans un
+ordre aléatoire.
+
+    python benchmarks/bench_pack.py --files 20000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lyrics_pack import LyricsPack, write_pack  # noqa: E402
+
+
+def write_corpus(folder, source, count):
+    sources = []
+    for name in sorted(os.listdir(source)):
+        if name.endswith('.lrc'):
+            with open(os.path.join(source, name), 'rb') as f:
+                sources.append(f.read())
+    names = []
+    for i in range(count):
+        name = f"Chanson {i:06d}.lrc"
+        with open(os.path.join(folder, name), 'wb') as f:
+            f.write(sources[i % len(sources)].replace(b'[offset:+0]', f'[offset:+{i}]'.encode()))
+        names.append(name)
+    return names
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du pack de paroles")
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--lyrics", default=os.path.join(ROOT, 'lyrics'))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, 'lyrics')
+        os.makedirs(folder)
+        names = write_corpus(folder, args.lyrics, args.files)
+        order = names[:]
+        random.Random(1).shuffle(order)
+        total = sum(os.path.getsize(os.path.join(folder, n)) for n in names)
+
+        def read_files():
+            for n in order:
+                with open(os.path.join(folder, n), 'r', encoding='utf-8', newline='') as f:
+                    f.read()
+
+        files_time = timed(read_files)
+        print(f"{args.files} fichiers ({total / 1e6:.1f} Mo) : lecture fichier par fichier {files_time * 1e3:.0f} ms")
+
+        failures = 0
+        for compress in (False, True):
+            pack_path, table_path = os.path.join(tmp, 'lyrics.pack'), os.path.join(tmp, 'lyrics.pack.json')
+            build = timed(lambda: write_pack(names, folder, pack_path, table_path, compress=compress))
+            with LyricsPack(table_path) as pack:
+                for n in names:
+                    with open(os.path.join(folder, n), 'r', encoding='utf-8', newline='') as f:
+                        if pack.read(n) != f.read():
+                            failures += 1
+                read = timed(lambda: [pack.read(n) for n in order])
+                raw = timed(lambda: [pack.raw(n).release() for n in order])
+            label = "compressé" if compress else "brut"
+            print(f"Pack {label:<9} : {os.path.getsize(pack_path) / 1e6:.1f} Mo, construit en {build * 1e3:.0f} ms, "
+                  f"lecture {read * 1e3:.0f} ms (x{files_time / read:.1f}), tranches sans copie {raw * 1e3:.1f} ms")
+
+        print(f"Contenu : {failures} entrées différentes des fichiers d'origine")
+        return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Benchmark de la base de paroles (lyrics_store) face au dossier de sortie (aucune requête réseau).
+
+Écrit les mêmes chansons synthétiques avec plusieurs threads dans un dossier (OutputIndex,
+comme un téléchargement), dans une base LyricsStore (WAL) et dans une base --store-network
+(journal "rollback"), compare la recherche par artiste (parcours du dossier vs index SQLite),
+puis exporte la base et vérifie que l'export est identique au dossier écrit directement.
+
+    python benchmarks/bench_store.py --songs 20000 --threads 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lyrics_store import LyricsStore  # noqa: E402
+from output_index import OutputIndex, lrc_header, safe_filename  # noqa: E402
+from sync_manifest import MANIFEST_FILENAME  # noqa: E402
+
+
+def make_songs(n):
+    songs = []
+    for i in range(n):
+        attrs = {'name': f"Chanson {i % (n // 3 + 1)}", 'artistName': f"Artiste {i % 500}",
+                 'albumName': f"Album {i % 2000}", 'isrc': f"FRX{i:09d}"}
+        lrc = "\n".join(f"[{m:02d}:{s:02d}.00]Ligne {k} de la chanson {i}"
+                        for k, (m, s) in enumerate(divmod(t * 4, 60) for t in range(40)))
+        songs.append(({'id': str(1000000 + i), 'attributes': attrs}, lrc))
+    return songs
+
+
+def read_folder(folder):
+    result = {}
+    for name in os.listdir(folder):
+        if name != MANIFEST_FILENAME:
+            with open(os.path.join(folder, name), encoding='utf-8') as f:
+                result[name] = f.read()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la base de paroles")
+    parser.add_argument("--songs", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=10)
+    args = parser.parse_args()
+
+    songs = make_songs(args.songs)
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, 'folder')
+        os.makedirs(folder)
+        index = OutputIndex(folder)
+
+        def save_file(item):
+            song, lrc = item
+            a = song['attributes']
+            index.save(safe_filename(a['name'], a['artistName']), lrc_header(a['name'], a['artistName']), lrc)
+
+        store = LyricsStore(os.path.join(tmp, 'store.db'))
+        network_store = LyricsStore(os.path.join(tmp, 'network.db'), network=True)  # --store-network
+        for label, fn in (("Dossier", save_file), ("Base SQLite", lambda item: store.save(item[0], item[1])),
+                          ("Base réseau", lambda item: network_store.save(item[0], item[1]))):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.threads) as executor:
+                list(executor.map(fn, songs))
+            elapsed = time.perf_counter() - start
+            print(f"{label:12s} : {args.songs / elapsed:7.0f} chansons/s écrites ({args.threads} threads)")
+
+        artists = [f"Artiste {i}" for i in range(0, 500, 5)]
+        start = time.perf_counter()
+        for artist in artists:
+            suffix = f" - {artist}.lrc"
+            folder_hits = [n for n in os.listdir(folder) if n.endswith(suffix)]
+        scan = (time.perf_counter() - start) / len(artists)
+        start = time.perf_counter()
+        for artist in artists:
+            store_hits = store.find(artist=artist)
+        lookup = (time.perf_counter() - start) / len(artists)
+        assert len(folder_hits) == len(store_hits)
+        print(f"Recherche par artiste : parcours du dossier {scan * 1000:.2f} ms, base {lookup * 1000:.3f} ms")
+
+        exported = os.path.join(tmp, 'export')
+        start = time.perf_counter()
+        store.export(exported)
+        print(f"Export de la base : {time.perf_counter() - start:.2f}s")
+        store.close()
+        network_store.close()
+
+        # Les numéros "(1)" des homonymes dépendent de l'ordre d'écriture : on compare les contenus
+        identical = sorted(read_folder(folder).values()) == sorted(read_folder(exported).values())
+        print(f"Export identique au dossier écrit directement : {'oui' if identical else 'NON'}")
+        return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
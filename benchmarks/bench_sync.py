@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Benchmark de lrc_sync : lecture des .lrc de lyrics/ en timelines, puis recherche de la ligne
+et du mot en cours (lookup unitaire, lookup_many, curseurs d'auditeurs en lecture continue).
+
+Chaque résultat est comparé à un parcours linéaire de référence, avec et sans [offset:].
+
+    python benchmarks/bench_sync.py --positions 200000 --listeners 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lrc_sync import LrcTimeline  # noqa: E402
+
+TICK = 0.05  # Rafraîchissement d'un affichage karaoké (secondes)
+
+
+def brute_force(timeline, position):
+    """Référence O(n) : dernière ligne commencée, puis dernier mot commencé de cette ligne."""
+    line = -1
+    for i, start in enumerate(timeline.line_starts):
+        if start <= position:
+            line = i
+    word = -1
+    if line >= 0:
+        for j in range(timeline.word_bounds[line], timeline.word_bounds[line + 1]):
+            if timeline.word_starts[j] <= position:
+                word = j
+    return line, word
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de lrc_sync")
+    parser.add_argument("--lyrics", default=os.path.join(ROOT, 'lyrics'))
+    parser.add_argument("--positions", type=int, default=200000)
+    parser.add_argument("--listeners", type=int, default=2000)
+    args = parser.parse_args()
+
+    texts = []
+    for name in sorted(os.listdir(args.lyrics)):
+        if name.endswith('.lrc'):
+            with open(os.path.join(args.lyrics, name), 'r', encoding='utf-8') as f:
+                texts.append(f.read())
+
+    start = time.perf_counter()
+    timelines = [LrcTimeline(text) for text in texts]
+    parse = (time.perf_counter() - start) / len(texts)
+    lines = sum(len(t) for t in timelines)
+    words = sum(len(t.words) for t in timelines)
+    print(f"{len(texts)} fichiers, {lines} lignes, {words} mots : lecture {parse * 1e6:.0f} µs/fichier")
+
+    rng = random.Random(0)
+    errors = 0
+    for text, timeline in zip(texts, timelines):
+        shifted = LrcTimeline(text.replace('[offset:+0]', '[offset:+500]').replace('[offset:0]', '[offset:500]'))
+        duration = timeline.line_starts[-1] + 10
+        for _ in range(2000):
+            position = rng.uniform(-5, duration)
+            errors += timeline.lookup(position) != brute_force(timeline, position)
+            # [offset:+500] : les paroles arrivent 0,5 s plus tôt
+            errors += shifted.lookup(position) != timeline.lookup(position + 0.5)
+    print(f"Vérification contre un parcours linéaire (avec et sans [offset:]) : {errors} différences")
+
+    timeline = max(timelines, key=len)
+    duration = timeline.line_starts[-1] + 10
+    positions = [rng.uniform(0, duration) for _ in range(args.positions)]
+    start = time.perf_counter()
+    for position in positions:
+        timeline.lookup(position)
+    single = (time.perf_counter() - start) / len(positions)
+    print(f"lookup      : {single * 1e6:.2f} µs/position ({len(timeline)} lignes)")
+    for label, batch_positions in (("aléatoires", positions), ("triées", sorted(positions))):
+        start = time.perf_counter()
+        found = timeline.lookup_many(batch_positions)
+        batch = (time.perf_counter() - start) / len(positions)
+        print(f"lookup_many : {batch * 1e6:.2f} µs/position ({len(positions)} positions {label})")
+        errors += found != [timeline.lookup(position) for position in batch_positions]
+
+    # Auditeurs à des positions différentes, rafraîchis tous les TICK : surtout des avances d'une ligne,
+    # et un saut (seek) de temps en temps
+    cursors = [timeline.cursor() for _ in range(args.listeners)]
+    offsets = [rng.uniform(0, duration / 2) for _ in cursors]
+    ticks = int(30 / TICK)
+    start = time.perf_counter()
+    for tick in range(ticks):
+        now = tick * TICK
+        for cursor, offset in zip(cursors, offsets):
+            cursor.update(offset + now)
+    updates = ticks * len(cursors)
+    elapsed = time.perf_counter() - start
+    print(f"Curseurs    : {elapsed / updates * 1e6:.2f} µs/mise à jour, {args.listeners} auditeurs rafraîchis "
+          f"toutes les {TICK * 1000:.0f} ms = {elapsed / ticks / TICK * 100:.1f}% d'un cœur")
+    errors += sum(c.update(o + (ticks - 1) * TICK) != timeline.lookup(o + (ticks - 1) * TICK) for c, o in zip(cursors, offsets))
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
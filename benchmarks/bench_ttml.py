@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Micro-benchmark TTML -> LRC : convertisseur incrémental vs ancien convertisseur (arbre complet).
+
+Le corpus est soit synthétisé à partir des fichiers de lyrics/ (TTML syllabique au format
+Apple Music), soit lu depuis un cache de paroles (--cache lyrics_cache.db).
+Chaque document est d'abord converti par les deux implémentations : les sorties doivent
+être identiques octet par octet.
+
+    python benchmarks/bench_ttml.py
+    python benchmarks/bench_ttml.py --cache lyrics_cache.db --repeat 3
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ttml_convert import ttml_to_lrc  # noqa: E402
+
+LRC_TAG = re.compile(r'^\[(\d+:)?\d+(\.\d+)?\](.*)$')
+WORD = re.compile(r'<((?:\d+:)?\d+(?:\.\d+)?)>([^<]*)')
+
+
+def legacy_format_lrc_time(time_str):
+    """Ancien formatage des timestamps, conservé comme référence."""
+    if not time_str: return "00:00.00"
+    parts = time_str.split(':')
+    try:
+        if len(parts) == 3:
+            h, m, s = int(parts[0]), int(parts[1]), float(parts[2])
+            return f"{h * 60 + m:02d}:{s:05.2f}"
+        elif len(parts) == 2:
+            m, s = int(parts[0]), float(parts[1])
+            return f"{m:02d}:{s:05.2f}"
+        else:
+            return time_str
+    except ValueError:
+        return time_str
+
+
+def legacy_ttml_to_lrc(ttml):
+    """Ancienne implémentation (regex + ET.fromstring), conservée comme référence."""
+    if not ttml: return None, False
+    ttml = re.sub(r'\sxmlns[^\"]+\"[^\"]+"', '', ttml)
+    ttml = ttml.replace('itunes:', '').replace('ttm:', '')
+    try:
+        root = ET.fromstring(ttml)
+        lines = []
+        is_karaoke = False
+        for p in root.findall('.//p'):
+            begin = p.attrib.get('begin', '00:00.000')
+            lrc_time = legacy_format_lrc_time(begin)
+            agent = p.attrib.get('agent', '')
+            prefix = f"{agent}: " if agent else ""
+            spans = p.findall('./span')
+            has_sub_timings = spans and any('begin' in s.attrib for s in spans)
+            if has_sub_timings:
+                is_karaoke = True
+                content = ""
+                for s in spans:
+                    txt = "".join(s.itertext())
+                    s_begin = s.attrib.get('begin')
+                    if s_begin:
+                        content += f"<{legacy_format_lrc_time(s_begin)}>{txt}"
+                    else:
+                        content += txt
+                lines.append(f"[{lrc_time}]{prefix}{content}")
+            else:
+                txt = "".join(p.itertext()).strip()
+                if txt:
+                    lines.append(f"[{lrc_time}]{prefix}{txt}")
+        return "\n".join(lines), is_karaoke
+    except Exception:
+        return None, False
+
+
+def _ttml_time(seconds, style):
+    m, s = divmod(seconds, 60)
+    if style == 0:
+        return f"{int(m) // 60:02d}:{int(m) % 60:02d}:{s:06.3f}"
+    if style == 1:
+        return f"{int(m):02d}:{s:06.3f}"
+    return f"{seconds:.3f}"
+
+
+def _seconds(tag):
+    if ':' in tag:
+        m, s = tag.split(':')
+        return int(m) * 60 + float(s)
+    return float(tag)
+
+
+def synthesize_ttml(lrc_text, style=1, word_timing=True):
+    """Construit un TTML Apple Music (namespaces, head, agents, fond vocal) à partir d'un .lrc."""
+    body = []
+    for n, raw in enumerate(lrc_text.splitlines()):
+        m = LRC_TAG.match(raw)
+        if not m or raw.startswith(('[ti:', '[ar:', '[offset:')):
+            continue
+        begin = _seconds(raw[1:raw.index(']')])
+        text = m.group(3)
+        agent = 'v1'
+        if ':' in text[:4] and text[:2] in ('v1', 'v2'):
+            agent, text = text[:2], text[3:]
+        words = WORD.findall(text) or [(None, text)]
+        end = begin + 2.0
+        if word_timing and words[0][0] is not None:
+            spans = []
+            for i, (t, w) in enumerate(words):
+                t = _seconds(t)
+                w_end = _seconds(words[i + 1][0]) if i + 1 < len(words) else t + 0.4
+                w = w.replace('&', '&amp;').replace('<', '&lt;')
+                span = f'<span begin="{_ttml_time(t, style)}" end="{_ttml_time(w_end, style)}">{w.strip()}</span>'
+                spans.append(span + (' ' if w.endswith(' ') else ''))
+            if n % 5 == 0:
+                spans.append(f'<span ttm:role="x-bg"><span begin="{_ttml_time(end, style)}">(oh)</span></span>')
+            inner = ''.join(spans)
+        else:
+            plain = WORD.sub(lambda mm: mm.group(2), text)
+            inner = plain.replace('&', '&amp;').replace('<', '&lt;')
+        body.append(f'<p begin="{_ttml_time(begin, style)}" end="{_ttml_time(end, style)}" '
+                    f'itunes:key="L{n}" ttm:agent="{agent}">{inner}</p>')
+
+    timing = "Word" if word_timing else "Line"
+    return ('<tt xmlns="http://www.w3.org/ns/ttml" xmlns:itunes="http://music.apple.com/lyric-ttml-internal" '
+            'xmlns:ttm="http://www.w3.org/ns/ttml#metadata" xml:lang="fr" '
+            f'itunes:timing="{timing}"><head><metadata><ttm:agent type="person" xml:id="v1"/>'
+            '<iTunesMetadata xmlns="http://music.apple.com/lyric-ttml-internal" leadingSilence="0.000">'
+            '<songwriters><songwriter>Inconnu</songwriter></songwriters></iTunesMetadata></metadata></head>'
+            f'<body dur="{_ttml_time(600, style)}"><div>{"".join(body)}</div></body></tt>')
+
+
+def corpus_from_lyrics(folder, copies):
+    docs = []
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith('.lrc'):
+            continue
+        with open(os.path.join(folder, name), 'r', encoding='utf-8') as f:
+            text = f.read()
+        for style in range(3):
+            docs.append(synthesize_ttml(text, style, word_timing=True))
+        docs.append(synthesize_ttml(text, 1, word_timing=False))
+    return docs * copies
+
+
+def corpus_from_cache(path):
+    conn = sqlite3.connect(path)
+    docs = [row[0] for row in conn.execute("SELECT ttml FROM lyrics WHERE ttml IS NOT NULL")]
+    conn.close()
+    return docs
+
+
+def bench(name, fn, docs, repeat):
+    """Meilleur temps sur `repeat` passes complètes du corpus."""
+    total_bytes = sum(len(d.encode('utf-8')) for d in docs)
+    elapsed = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for d in docs:
+            fn(d)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    count = len(docs)
+    print(f"{name:<12} {count / elapsed:10.0f} docs/s  {total_bytes / elapsed / 1e6:8.1f} Mo/s  "
+          f"({elapsed * 1e6 / count:.0f} µs/doc)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TTML -> LRC")
+    parser.add_argument("--cache", help="Utiliser les TTML d'un cache de paroles (lyrics_cache.db)")
+    parser.add_argument("--lyrics", default=os.path.join(ROOT, 'lyrics'), help="Dossier .lrc pour le corpus synthétique")
+    parser.add_argument("--copies", type=int, default=50, help="Copies du corpus synthétique")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    docs = corpus_from_cache(args.cache) if args.cache else corpus_from_lyrics(args.lyrics, args.copies)
+    if not docs:
+        print("❌ Corpus vide.")
+        return 1
+
+    mismatches = 0
+    for d in set(docs):
+        if ttml_to_lrc(d) != legacy_ttml_to_lrc(d):
+            mismatches += 1
+    print(f"Corpus : {len(docs)} documents, {sum(map(len, docs)) / 1e6:.1f} M caractères, "
+          f"{mismatches} sorties différentes de l'ancien convertisseur.")
+
+    legacy = bench("ancien", legacy_ttml_to_lrc, docs, args.repeat)
+    stream = bench("incrémental", ttml_to_lrc, docs, args.repeat)
+    print(f"Gain : x{legacy / stream:.2f}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
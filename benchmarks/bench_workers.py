@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark du mode distribué (--plan / --worker) contre le serveur local fake_apple_api.py.
+
+Planifie la bibliothèque dans une file de travail, puis lance 1, 2, 4... workers en même
+temps sur la même file et le même dossier de sortie. Avec --kill, le premier worker est
+tué (SIGKILL) en cours de route : ses chansons doivent être reprises à l'expiration de son bail.
+Pour chaque run : chansons/s, durée, et vérifications (toutes les chansons traitées une
+seule fois, un fichier par chanson avec paroles, aucun fichier "(1)" ni temporaire).
+
+    python benchmarks/bench_workers.py --songs 3000 --workers 1 2 4
+    python benchmarks/bench_workers.py --workers 3 --kill --lease 10
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+
+from bench_e2e import fake_token  # noqa: E402
+from work_queue import WorkQueue  # noqa: E402
+
+
+def run(base, workers, threads, lease, kill, tmp):
+    """Planification puis `workers` workers en parallèle ; retourne les mesures et les erreurs de vérification."""
+    work = tempfile.mkdtemp(dir=tmp)
+    with open(os.path.join(work, 'bearer_token.json'), 'w') as f:
+        json.dump({'token': fake_token()}, f)
+    with open(os.path.join(work, 'user_token.txt'), 'w') as f:
+        f.write("bench")
+    queue_path = os.path.join(work, 'work_queue.db')
+    out = os.path.join(work, 'out')
+    common = ['--queue', queue_path, '-o', out, '--no-cache']
+    env = dict(os.environ, APPLE_MUSIC_API_BASE=base, PYTHONIOENCODING='utf-8')
+    script = os.path.join(ROOT, 'apple_lyrics.py')
+
+    subprocess.run([sys.executable, script, '--library', '--plan', *common], cwd=work, env=env,
+                   stdout=subprocess.DEVNULL, stdin=subprocess.DEVNULL, check=True)
+
+    start = time.perf_counter()
+    processes = []
+    for i in range(workers):
+        log = open(os.path.join(work, f'worker{i}.txt'), 'w', encoding='utf-8')
+        processes.append(subprocess.Popen(
+            [sys.executable, script, '--worker', '--lease', str(lease), '-t', str(threads), *common],
+            cwd=work, env=env, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL))
+        log.close()
+    if kill:
+        time.sleep(1.0)
+        processes[0].send_signal(signal.SIGKILL)
+    codes = [p.wait() for p in processes]
+    wall = time.perf_counter() - start
+
+    queue = WorkQueue(queue_path)
+    stats = queue.stats()
+    queue.close()
+    names = os.listdir(out)
+    files = [n for n in names if n.endswith('.lrc')]
+    errors = []
+    if any(code != 0 for code in codes[1 if kill else 0:]):
+        errors.append(f"code de sortie {codes}")
+    if set(stats) - {'ok', 'no_lyrics'}:
+        errors.append(f"file non terminée : {stats}")
+    if len(files) != stats.get('ok', 0):
+        errors.append(f"{len(files)} fichiers pour {stats.get('ok', 0)} chansons 'ok'")
+    if any('(1)' in n for n in files):
+        errors.append("fichier en double")
+    if not kill and any(n.endswith('.tmp') for n in names):  # Un worker tué peut laisser son fichier temporaire
+        errors.append("fichier temporaire restant")
+    done = sum(stats.values())
+    return {'songs': done, 'songs_per_s': done / wall if wall else 0.0, 'wall': wall, 'stats': stats, 'errors': errors}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du mode distribué contre un serveur local")
+    parser.add_argument("--workers", nargs='+', type=int, default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=10, help="Threads par worker")
+    parser.add_argument("--songs", type=int, default=2000, help="Taille de la bibliothèque")
+    parser.add_argument("--latency", type=float, default=50.0, help="Latence moyenne du serveur (ms)")
+    parser.add_argument("--lease", type=int, default=30, help="Bail des workers (secondes)")
+    parser.add_argument("--kill", action="store_true", help="Tuer le premier worker en cours de route")
+    args = parser.parse_args()
+
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, 'fake_apple_api.py'), '--port', '0', '--songs', str(args.songs),
+         '--latency', str(args.latency)],
+        stdout=subprocess.PIPE, text=True)
+    base = server.stdout.readline().strip()
+    failed = False
+    try:
+        print(f"Serveur {base} : {args.songs} chansons, latence {args.latency:.0f} ms, {args.threads} threads par worker"
+              + (", premier worker tué" if args.kill else "") + "\n")
+        print(f"{'workers':>7s} {'chansons':>8s} {'ch/s':>7s} {'durée':>7s}  vérification")
+        with tempfile.TemporaryDirectory() as tmp:
+            for workers in args.workers:
+                r = run(base, workers, args.threads, max(10, args.lease), args.kill, tmp)
+                check = "OK" if not r['errors'] else "❌ " + " ; ".join(r['errors'])
+                failed |= bool(r['errors'])
+                print(f"{workers:7d} {r['songs']:8d} {r['songs_per_s']:7.1f} {r['wall']:6.1f}s  {check}")
+    finally:
+        server.terminate()
+        server.wait()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
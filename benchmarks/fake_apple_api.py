@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""Serveur local qui remplace l'API Apple Music pour les benchmarks (aucun token, aucun réseau).
+
+Sert un catalogue synthétique avec la forme des réponses réelles : recherche (chansons et
+artistes), bibliothèque paginée, playlists, albums d'un artiste, albums?ids=&include=tracks,
+songs?ids= (hasLyrics / hasTimeSyncedLyrics), charts, syllable-lyrics et lyrics.
+Les TTML sont synthétisés depuis lyrics/ (voir bench_ttml.py) ou rejoués depuis un
+cache de paroles réel (--cache lyrics_cache.db).
+
+Latence, 429, erreurs 5xx et proportion de chansons sans paroles sont réglables.
+GET /_stats renvoie le nombre de requêtes servies par endpoint et par statut.
+
+    python benchmarks/fake_apple_api.py --songs 5000 --latency 80 --rate-limit 0.02
+    APPLE_MUSIC_API_BASE=http://127.0.0.1:8765 python apple_lyrics.py --library
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_ttml import corpus_from_cache, corpus_from_lyrics  # noqa: E402
+
+ALBUM_SIZE = 12
+PLAYLIST_SIZE = 500
+SONG_ID_BASE = 1000000
+TITLE_TERM = re.compile(r'chanson (\d+)')
+ARTIST_TERM = re.compile(r'artiste (\d+)')
+
+
+class Catalog:
+    """Catalogue synthétique : la chanson i appartient à l'album i // ALBUM_SIZE, l'album j à l'artiste j % artists."""
+
+    def __init__(self, songs, artists, missing, standard, docs, seed=0):
+        self.count = songs
+        self.artists = artists
+        self.albums = (songs + ALBUM_SIZE - 1) // ALBUM_SIZE
+        self.docs = docs
+        rng = random.Random(seed)
+        # Paroles de chaque chanson : 0 = aucune, 1 = standard seulement, 2 = syllabiques
+        self.kind = []
+        for _ in range(songs):
+            r = rng.random()
+            self.kind.append(0 if r < missing else 1 if r < missing + standard else 2)
+        self.lyrics_bodies = {}
+
+    def index(self, song_id):
+        try:
+            i = int(song_id) - SONG_ID_BASE
+        except ValueError:
+            return None
+        return i if 0 <= i < self.count else None
+
+    def song(self, i):
+        album = i // ALBUM_SIZE
+        artist = album % self.artists
+        sid = str(SONG_ID_BASE + i)
+        return {
+            'id': sid, 'type': 'songs', 'href': f"/v1/catalog/fr/songs/{sid}",
+            'attributes': {
+                'name': f"Chanson {i}", 'artistName': f"Artiste {artist}", 'albumName': f"Album {album}",
+                'isrc': f"FRBEN{i:07d}", 'genreNames': ["Pop", "Musique"], 'trackNumber': i % ALBUM_SIZE + 1,
+                'durationInMillis': 180000 + i % 60000, 'releaseDate': "2020-01-01",
+                'hasLyrics': self.kind[i] > 0, 'hasTimeSyncedLyrics': self.kind[i] == 2,
+                'artwork': {'width': 3000, 'height': 3000, 'url': f"https://is1-ssl.mzstatic.com/image/thumb/{sid}/{{w}}x{{h}}bb.jpg"},
+                'playParams': {'id': sid, 'kind': 'song'}
+            }
+        }
+
+    def library_song(self, i):
+        song = self.song(i)
+        attrs = {k: v for k, v in song['attributes'].items() if k not in ('isrc', 'hasLyrics', 'hasTimeSyncedLyrics')}
+        attrs['playParams'] = {'id': f"i.{song['id']}", 'kind': 'song', 'isLibrary': True, 'catalogId': song['id']}
+        return {'id': f"i.{song['id']}", 'type': 'library-songs', 'attributes': attrs}
+
+    def album(self, j, include_tracks=False):
+        album = {'id': str(j), 'type': 'albums',
+                 'attributes': {'name': f"Album {j}", 'artistName': f"Artiste {j % self.artists}", 'trackCount': ALBUM_SIZE}}
+        if include_tracks:
+            album['relationships'] = {'tracks': {'data': [self.song(i) for i in self.album_songs(j)]}}
+        return album
+
+    def album_songs(self, j):
+        return range(j * ALBUM_SIZE, min((j + 1) * ALBUM_SIZE, self.count))
+
+    def artist_albums(self, artist):
+        return list(range(artist, self.albums, self.artists))
+
+    def lyrics_body(self, i):
+        doc = i % len(self.docs)
+        body = self.lyrics_bodies.get(doc)
+        if body is None:
+            body = self.lyrics_bodies[doc] = json.dumps(
+                {'data': [{'id': str(SONG_ID_BASE + i), 'type': 'lyrics', 'attributes': {'ttml': self.docs[doc]}}]}).encode('utf-8')
+        return body
+
+
+def page(items, params, default_limit=25):
+    offset = int(params.get('offset', 0))
+    limit = int(params.get('limit', default_limit))
+    return {'data': items[offset:offset + limit], 'meta': {'total': len(items)}}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, comme l'API réelle
+    catalog = None
+    options = None
+    stats = {}
+    stats_lock = Lock()
+    rng = random.Random()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _count(self, endpoint, status):
+        key = f"{endpoint} {status}"
+        with self.stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == '/_stats':
+            with self.stats_lock:
+                return self._send(200, json.dumps(self.stats).encode('utf-8'))
+
+        options = self.options
+        delay = options.latency + self.rng.uniform(-options.jitter, options.jitter)
+        time.sleep(max(0.0, delay) / 1000)
+
+        parts = url.path.strip('/').split('/')
+        endpoint = self._endpoint(parts)
+        r = self.rng.random()
+        if r < options.rate_limit:
+            self._count(endpoint, 429)
+            headers = {'Retry-After': str(options.retry_after)} if options.retry_after is not None else None
+            return self._send(429, b'{"errors":[{"status":"429"}]}', headers)
+        if r < options.rate_limit + options.server_errors:
+            self._count(endpoint, 500)
+            return self._send(500, b'{"errors":[{"status":"500"}]}')
+
+        status, body = self._route(endpoint, parts, params)
+        self._count(endpoint, status)
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        self._send(status, body)
+
+    @staticmethod
+    def _endpoint(parts):
+        """Nom court de l'endpoint, pour les statistiques."""
+        if parts[:3] == ['v1', 'me', 'library']:
+            return 'library/' + '/'.join(p if i % 2 == 0 else '{id}' for i, p in enumerate(parts[3:]))
+        if parts[:2] == ['v1', 'catalog'] and len(parts) > 3:
+            rest = parts[3:]
+            return '/'.join(p if i % 2 == 0 else '{id}' for i, p in enumerate(rest))
+        return '/'.join(parts)
+
+    def _route(self, endpoint, parts, params):
+        catalog = self.catalog
+        if endpoint == 'search':
+            term = params.get('term', '').lower()
+            results = {}
+            if 'songs' in params.get('types', ''):
+                m = TITLE_TERM.search(term)
+                if m and int(m.group(1)) < catalog.count:
+                    # La chanson demandée, suivie des suivantes jusqu'à limit (comme une vraie liste de résultats)
+                    first = int(m.group(1))
+                    last = min(first + int(params.get('limit', 5)), catalog.count)
+                    results['songs'] = {'data': [catalog.song(i) for i in range(first, last)]}
+            if 'artists' in params.get('types', ''):
+                m = ARTIST_TERM.search(term)
+                if m and int(m.group(1)) < catalog.artists:
+                    a = int(m.group(1))
+                    results['artists'] = {'data': [{'id': f"a{a}", 'type': 'artists',
+                                                    'attributes': {'name': f"Artiste {a}", 'genreNames': ["Pop"]}}]}
+            return 200, {'results': results}
+        if endpoint == 'library/songs':
+            return 200, page(LazyList(catalog.count, catalog.library_song), params)
+        if endpoint == 'library/playlists':
+            return 200, page([{'id': "p.bench", 'type': 'library-playlists',
+                               'attributes': {'name': "Playlist bench", 'lastModifiedDate': "2026-01-01T00:00:00Z"}}], params)
+        if endpoint == 'library/playlists/{id}/tracks':
+            return 200, page(LazyList(min(PLAYLIST_SIZE, catalog.count), catalog.library_song), params)
+        if endpoint == 'library/recently-added':
+            return 200, {'data': []}
+        if endpoint == 'artists/{id}/albums':
+            albums = catalog.artist_albums(int(parts[4].lstrip('a')))
+            return 200, page(LazyList(len(albums), lambda k: catalog.album(albums[k])), params)
+        if endpoint == 'albums':
+            ids = [int(i) for i in params.get('ids', '').split(',') if i.isdigit() and int(i) < catalog.albums]
+            return 200, {'data': [catalog.album(j, include_tracks=params.get('include') == 'tracks') for j in ids]}
+        if endpoint == 'albums/{id}/tracks':
+            songs = list(catalog.album_songs(int(parts[4])))
+            return 200, page(LazyList(len(songs), lambda k: catalog.song(songs[k])), params)
+        if endpoint == 'songs':
+            found = [catalog.index(i) for i in params.get('ids', '').split(',')]
+            return 200, {'data': [catalog.song(i) for i in found if i is not None]}
+        if endpoint in ('songs/{id}/syllable-lyrics', 'songs/{id}/lyrics'):
+            i = catalog.index(parts[4])
+            needed = 2 if endpoint.endswith('syllable-lyrics') else 1
+            if i is None or catalog.kind[i] < needed:
+                return 404, b'{"errors":[{"status":"404"}]}'
+            return 200, catalog.lyrics_body(i)
+        if endpoint == 'charts':
+            limit = min(int(params.get('limit', 50)), catalog.count)
+            return 200, {'results': {'songs': [{'chart': 'most-played', 'data': [catalog.song(i) for i in range(limit)]}]}}
+        return 404, b'{"errors":[{"status":"404"}]}'
+
+
+class LazyList:
+    """Séquence dont les éléments sont construits à la demande (seule la page servie est matérialisée)."""
+
+    def __init__(self, length, build):
+        self.length = length
+        self.build = build
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        return [self.build(i) for i in range(*index.indices(self.length))]
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Client tué en cours de requête (bench_workers.py --kill) : rien d'anormal côté serveur
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur local remplaçant l'API Apple Music (benchmarks)")
+    parser.add_argument("--port", type=int, default=8765, help="Port d'écoute (0 : port libre)")
+    parser.add_argument("--songs", type=int, default=5000, help="Taille du catalogue et de la bibliothèque")
+    parser.add_argument("--artists", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=50.0, help="Latence moyenne par requête (ms)")
+    parser.add_argument("--jitter", type=float, default=20.0, help="Variation de latence, ± ms")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Proportion de réponses 429")
+    parser.add_argument("--retry-after", type=float, help="Retry-After envoyé avec les 429 (secondes, absent par défaut)")
+    parser.add_argument("--server-errors", type=float, default=0.0, help="Proportion de réponses 500")
+    parser.add_argument("--missing", type=float, default=0.2, help="Proportion de chansons sans paroles")
+    parser.add_argument("--standard", type=float, default=0.3, help="Proportion de chansons sans paroles syllabiques")
+    parser.add_argument("--cache", help="Rejouer les TTML d'un cache de paroles réel (lyrics_cache.db)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    docs = corpus_from_cache(args.cache) if args.cache else corpus_from_lyrics(os.path.join(ROOT, 'lyrics'), 1)
+    Handler.catalog = Catalog(args.songs, args.artists, args.missing, args.standard, docs, args.seed)
+    Handler.options = args
+    Handler.rng = random.Random(args.seed)
+    server = FakeServer(('127.0.0.1', args.port), Handler)
+    print(f"http://127.0.0.1:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,351 @@
-import os
-import json
-
-LYRICS_FOLDER = 'lyrics'
-OUTPUT_FILE = 'database.json'
-
-data = []
-
-if not os.path.exists(LYRICS_FOLDER):
-    print(f"Le dossier '{LYRICS_FOLDER}' n'existe pas. Créez-le et mettez vos fichiers .lrc dedans.")
-    exit()
-
-print("Scan des fichiers en cours...")
-files = sorted(os.listdir(LYRICS_FOLDER))
-
-for filename in files:
-    if filename.endswith(".lrc"):
-        entry = {
-            "filename": filename,
-            "path": f"{LYRICS_FOLDER}/{filename}"
-        }
-        data.append(entry)
-
-with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-    json.dump(data, f, ensure_ascii=False, indent=4)
-
-print(f"Succès ! {len(data)} fichiers indexés dans {OUTPUT_FILE}.")
\ No newline at end of file
+import os
+import re
+import sys
+import json
+import argparse
+import hashlib
+import time
+import unicodedata
+
+from lyrics_pack import PACK_TABLE, write_pack
+from ttml_convert import parse_seconds
+
+LYRICS_FOLDER = 'lyrics'
+OUTPUT_FILE = 'database.json'
+STATE_FILE = '.db_state.json'  # Hash du contenu de chaque fichier déjà analysé (non versionné, mis en cache par la CI)
+SEARCH_FOLDER = 'search'       # Index de recherche titre/artiste, découpé en shards
+SHARD_PREFIX = 2               # Les tokens sont répartis par leurs 2 premiers caractères
+DOCS_CHUNK = 500               # Documents (titre, artiste, fichier) par fichier d_<n>.json de l'index de recherche
+LINES_FOLDER = os.path.join(SEARCH_FOLDER, 'lines')  # Index plein texte des paroles (voir lyrics_search.py)
+LINES_PREFIX = 3               # Préfixe des shards de tokens de l'index plein texte
+LINES_CHUNK = 64               # Nombre de fichiers par shard de lignes
+INDEX_VERSION = 4              # À changer avec le format des index ou fold()/tokenize() : l'index plein texte est alors reconstruit
+
+TIME_TAG = re.compile(r'[\[<]((?:\d+:)?\d+(?:\.\d+)?)[\]>]')
+HEADER_TAG = re.compile(r'^\[([A-Za-z]+):(.*)\]$')
+WORD_TAG = re.compile(r'<((?:\d+:)?\d+(?:\.\d+)?)>')
+AGENT_PREFIX = re.compile(r'^(v\d+):\s*')
+TAIL_LINES = 5  # La durée est lue sur les dernières lignes (les fonds vocaux peuvent se chevaucher)
+
+
+def parse_lrc(text, filename):
+    """Extrait les métadonnées d'un fichier .lrc (en-têtes, karaoké, nombre de lignes, durée)."""
+    headers = {}
+    timed = []
+    for line in text.split('\n'):
+        if line[:1] != '[':
+            line = line.strip()
+            if line[:1] != '[':
+                continue
+        if line[1:2].isdigit():
+            timed.append(line)
+        else:
+            header = HEADER_TAG.match(line.strip())
+            if header:
+                headers.setdefault(header.group(1).lower(), header.group(2).strip())
+
+    duration = 0.0
+    if timed:
+        duration = max(parse_seconds(tag) for tag in TIME_TAG.findall('\n'.join(timed[-TAIL_LINES:])))
+
+    # Repli sur le nom de fichier "Titre - Artiste.lrc"
+    name = filename[:-len('.lrc')]
+    parts = name.split(' - ')
+    try:
+        offset = int(headers.get('offset', '0'))
+    except ValueError:
+        offset = 0
+
+    return {
+        "title": headers.get('ti') or parts[0] or name,
+        "artist": headers.get('ar') or (parts[1] if len(parts) > 1 else 'Artiste inconnu'),
+        "offset": offset,
+        "karaoke": WORD_TAG.search(text) is not None,
+        "lines": len(timed),
+        "duration": round(duration, 2)
+    }
+
+
+NON_WORD = re.compile(r'[\W_]+')
+
+
+def fold(text):
+    """Minuscules sans accents ni autres marques combinantes ('Résiste' -> 'resiste'), identique à foldText() dans app.js.
+
+    Toutes les marques (catégorie Unicode M, le \\p{M} de JavaScript) sont retirées, pas seulement
+    celles de classe combinante non nulle : le navigateur n'a pas accès à cette classe.
+    """
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if unicodedata.category(c)[0] != 'M').lower()
+
+
+def tokenize(text):
+    """Découpe un texte replié en mots (lettres et chiffres)."""
+    return [t for t in NON_WORD.split(fold(text)) if t]
+
+
+def shard_file(key):
+    """Nom du fichier d'un shard : le préfixe lui-même s'il est ASCII, sinon son encodage hexadécimal."""
+    if key.isascii() and key.isalnum():
+        return f"{key}.json"
+    return f"_{key.encode('utf-8').hex()}.json"
+
+
+def build_search_index(entries, folder=SEARCH_FOLDER, prefix_len=SHARD_PREFIX, chunk=DOCS_CHUNK):
+    """Écrit l'index de recherche préfixe : manifest.json, un shard par préfixe de SHARD_PREFIX caractères
+    et les documents, par paquets de `chunk`.
+
+    Chaque shard contient ses tokens triés et les ids des documents de chaque token (postings
+    alignés sur tokens) : le front ne télécharge que le shard du mot tapé et y fait une
+    recherche dichotomique. Le titre, l'artiste et le fichier d'un document ne sont écrits
+    qu'une fois, dans d_<id // chunk>.json : seuls les paquets des résultats sont téléchargés.
+    Retourne le manifeste.
+    """
+    postings = {}
+    for doc_id, entry in enumerate(entries):
+        for token in set(tokenize(f"{entry['title']} {entry['artist']}")):
+            # Le front ignore les mots plus courts que le préfixe (en cours de frappe) : pas de shard pour eux
+            if len(token) >= prefix_len:
+                postings.setdefault(token, []).append(doc_id)
+
+    shards = {}
+    for token in sorted(postings):
+        shards.setdefault(token[:prefix_len], []).append(token)
+
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+    manifest = {"version": INDEX_VERSION, "prefix": prefix_len, "folder": LYRICS_FOLDER, "docs": len(entries),
+                "chunk": chunk, "shards": {}}
+    written = set()
+    for key, tokens in shards.items():
+        doc_count = len({d for t in tokens for d in postings[t]})
+        name = shard_file(key)
+        write_json_atomic(os.path.join(folder, name), {"tokens": tokens, "postings": [postings[t] for t in tokens]})
+        written.add(name)
+        manifest["shards"][key] = {"file": name, "tokens": len(tokens), "docs": doc_count}
+
+    for start in range(0, len(entries), chunk):
+        name = f"d_{start // chunk}.json"
+        docs = [[e['title'], e['artist'], e['filename']] for e in entries[start:start + chunk]]
+        write_json_atomic(os.path.join(folder, name), docs)
+        written.add(name)
+
+    write_json_atomic(os.path.join(folder, 'manifest.json'), manifest)
+    written.add('manifest.json')
+
+    # Shards devenus vides
+    for name in os.listdir(folder):
+        if name.endswith('.json') and name not in written:
+            os.remove(os.path.join(folder, name))
+    return manifest
+
+
+def split_lrc_line(line):
+    """Découpe une ligne d'un .lrc : (timestamps, chanteur, texte nu, [(timestamp, mot)]).
+
+    timestamps est vide pour une ligne non minutée (en-tête, texte libre). Les balises mot
+    à mot et le préfixe de chanteur ("v1:") sont retirés du texte ; une ligne peut porter
+    plusieurs timestamps ("[00:10.00][01:20.00]Refrain"). Partagé avec lrc_sync.py.
+    """
+    line = line.strip()
+    tags = []
+    while line[:1] == '[' and line[1:2].isdigit() and ']' in line:
+        end = line.index(']')
+        tags.append(line[1:end])
+        line = line[end + 1:]
+    if not tags:
+        return tags, None, '', []
+    agent = AGENT_PREFIX.match(line)
+    if agent:
+        line = line[agent.end():]
+    parts = WORD_TAG.split(line)  # [avant, temps, mot, temps, mot...]
+    words = [(parts[i], parts[i + 1].strip()) for i in range(1, len(parts) - 1, 2) if parts[i + 1].strip()]
+    text = ' '.join(''.join(parts[0::2]).split())
+    if ' ' not in text and len(words) > 1:
+        # Mots collés entre leurs balises ("<28.896>I<29.336>got") : la balise sert de séparateur
+        text = ' '.join(word for _, word in words)
+    return tags, agent and agent.group(1), text, words
+
+
+def parse_lrc_lines(text):
+    """Lignes minutées d'un .lrc : liste de (numéro de ligne dans le fichier, timestamp 'mm:ss.xx', texte nu).
+
+    Une ligne portant plusieurs timestamps donne une entrée par timestamp (voir split_lrc_line).
+    """
+    lines = []
+    for number, line in enumerate(text.split('\n'), 1):
+        tags, _, content, _ = split_lrc_line(line)
+        if content:
+            lines.extend((number, tag, content) for tag in tags)
+    return lines
+
+
+def build_lines_index(entries, lyrics_folder=LYRICS_FOLDER, folder=LINES_FOLDER,
+                      prefix_len=LINES_PREFIX, chunk=LINES_CHUNK):
+    """Écrit l'index plein texte des paroles : token -> (fichier, ligne, timestamp).
+
+    - manifest.json : noms des fichiers (l'id d'un fichier est sa position), shards de tokens ;
+    - t_<préfixe>.json : tokens triés et, pour chacun, ses occurrences sous forme de liste
+      plate [écart d'id de fichier, index de ligne, ...] (ids codés par différence) ;
+    - l_<n>.json : lignes des fichiers n*chunk .. (n+1)*chunk-1, [numéro, timestamp, texte].
+
+    Une requête ne lit que les shards de ses tokens puis les shards de lignes des
+    fichiers trouvés. Retourne le manifeste.
+    """
+    postings = {}
+    line_shards = {}
+    total = 0
+    for doc_id, entry in enumerate(entries):
+        path = os.path.join(lyrics_folder, entry['filename'])
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            lines = parse_lrc_lines(f.read())
+        line_shards.setdefault(doc_id // chunk, {})[str(doc_id)] = [list(line) for line in lines]
+        total += len(lines)
+        for index, (_, _, content) in enumerate(lines):
+            for token in set(tokenize(content)):
+                postings.setdefault(token, []).append((doc_id, index))
+
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+    written = set()
+    shards = {}
+    for token in sorted(postings):
+        shards.setdefault(token[:prefix_len], []).append(token)
+
+    manifest = {"version": INDEX_VERSION, "prefix": prefix_len, "chunk": chunk, "lines": total,
+                "docs": [entry['filename'] for entry in entries], "shards": {}}
+    for key, tokens in shards.items():
+        encoded = []
+        for token in tokens:
+            flat, previous = [], 0
+            for doc_id, index in postings[token]:
+                flat += (doc_id - previous, index)
+                previous = doc_id
+            encoded.append(flat)
+        name = 't_' + shard_file(key)
+        write_json_atomic(os.path.join(folder, name), {"tokens": tokens, "postings": encoded})
+        written.add(name)
+        manifest["shards"][key] = name
+
+    for number, docs in line_shards.items():
+        name = f"l_{number}.json"
+        write_json_atomic(os.path.join(folder, name), docs)
+        written.add(name)
+
+    write_json_atomic(os.path.join(folder, 'manifest.json'), manifest)
+    written.add('manifest.json')
+
+    for name in os.listdir(folder):
+        if name.endswith('.json') and name not in written:
+            os.remove(os.path.join(folder, name))
+    return manifest
+
+
+def load_state(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_json_atomic(path, data, indent=None):
+    """Écrit data en JSON via un fichier temporaire renommé. Ne touche pas au fichier si le contenu est identique."""
+    content = json.dumps(data, ensure_ascii=False, indent=indent, separators=None if indent else (',', ':'))
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def build_index(folder=LYRICS_FOLDER, state_file=STATE_FILE):
+    """Construit la liste des entrées, en ne ré-analysant que les fichiers modifiés.
+
+    Un fichier est reconnu à son hash : un checkout neuf (CI), qui change toutes les dates
+    de modification, ne fait rien ré-analyser. La date et la taille évitent seulement de
+    recalculer le hash des fichiers qui n'ont pas bougé depuis le run précédent.
+    Retourne (entrées triées par nom, nombre de fichiers analysés).
+    """
+    state = load_state(state_file)
+    new_state = {}
+    entries = []
+    parsed = 0
+
+    with os.scandir(folder) as it:
+        files = sorted((e for e in it if e.name.endswith('.lrc') and e.is_file()), key=lambda e: e.name)
+
+    for e in files:
+        st = e.stat()
+        known = state.get(e.name) or {}
+        if known.get('mtime') == st.st_mtime_ns and known.get('size') == st.st_size and 'sha1' in known:
+            digest = known['sha1']
+        else:
+            digest = file_digest(e.path)
+        if known.get('sha1') == digest and 'meta' in known:
+            meta = known['meta']
+        else:
+            with open(e.path, 'r', encoding='utf-8', errors='replace') as f:
+                meta = parse_lrc(f.read(), e.name)
+            parsed += 1
+        new_state[e.name] = {'sha1': digest, 'mtime': st.st_mtime_ns, 'size': st.st_size, 'meta': meta}
+        entry = {"filename": e.name, "path": f"{folder}/{e.name}"}
+        entry.update(meta)
+        entries.append(entry)
+
+    if new_state != state:
+        write_json_atomic(state_file, new_state)
+    return entries, parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indexe le dossier lyrics/ pour le site et la recherche")
+    parser.add_argument("--pack", action="store_true",
+                        help=f"Regroupe aussi les fichiers dans un pack unique + table des offsets ({PACK_TABLE})")
+    parser.add_argument("--compress", action="store_true", help="Compresse chaque entrée du pack (avec --pack)")
+    args = parser.parse_args()
+
+    if not os.path.exists(LYRICS_FOLDER):
+        print(f"Le dossier '{LYRICS_FOLDER}' n'existe pas. Créez-le et mettez vos fichiers .lrc dedans.")
+        sys.exit()
+
+    print("Scan des fichiers en cours...")
+    start = time.perf_counter()
+    data, parsed = build_index()
+    changed = write_json_atomic(OUTPUT_FILE, data, indent=4)
+    manifest = build_search_index(data)
+
+    # L'index plein texte relit tous les fichiers : il n'est reconstruit que si la liste ou un fichier a changé
+    lines_manifest = load_state(os.path.join(LINES_FOLDER, 'manifest.json'))
+    if (parsed or lines_manifest.get('version') != INDEX_VERSION
+            or lines_manifest.get('docs') != [e['filename'] for e in data]):
+        lines_manifest = build_lines_index(data)
+
+    if args.pack:
+        table = load_state(PACK_TABLE)
+        compression = "deflate" if args.compress else "none"
+        if parsed or table.get('compression') != compression or list(table.get('entries', {})) != [e['filename'] for e in data]:
+            table = write_pack([e['filename'] for e in data], LYRICS_FOLDER, compress=args.compress)
+        print(f"📦 Pack : {len(table['entries'])} fichiers, {table['size'] / 1e6:.1f} Mo ({table['compression']})")
+
+    status = "mis à jour" if changed else "inchangé"
+    print(f"Succès ! {len(data)} fichiers indexés dans {OUTPUT_FILE} ({status}, "
+          f"{parsed} analysés, {len(manifest['shards'])} shards de recherche, "
+          f"{lines_manifest['lines']} lignes de paroles indexées, {time.perf_counter() - start:.2f}s).")
+
+
+if __name__ == "__main__":
+    main()
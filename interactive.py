@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
+DEFAULT_PREFETCH = 3   # Résultats de recherche dont les paroles sont téléchargées pendant que l'utilisateur choisit
+MAX_SEARCHES = 256     # Recherches gardées en mémoire pendant la session
+
+
+class InteractiveSession:
+    """Mode interactif : recherches mémorisées et paroles préchargées pendant que la liste est affichée.
+
+    - search() garde les résultats de chaque recherche (terme normalisé, limite) le temps de la
+      session : relancer la même recherche est instantané. Une recherche sans résultat (ou en
+      erreur réseau) n'est pas mémorisée.
+    - prefetch() lance en arrière-plan le téléchargement des TTML des `prefetch` premiers résultats.
+    - fetch() sert la chanson choisie depuis son préchargement (attendu s'il est en cours), puis
+      abandonne les autres : ceux qui n'ont pas commencé sont annulés, ceux en cours s'arrêtent
+      avant leur requête suivante (Syllable -> Standard) et leur résultat est ignoré.
+    """
+
+    def __init__(self, app, normalize, prefetch=DEFAULT_PREFETCH):
+        self.app = app
+        self.normalize = normalize
+        self.prefetch_count = max(0, prefetch)
+        self.searches = OrderedDict()
+        self.pending = {}  # id catalogue -> (future, Event d'abandon)
+        self.executor = ThreadPoolExecutor(max_workers=self.prefetch_count) if self.prefetch_count else None
+
+    def search(self, term, limit):
+        key = (self.normalize(term), limit)
+        songs = self.searches.get(key)
+        if songs is not None:
+            self.searches.move_to_end(key)
+            self.app.metrics.inc('search_memo_hit')
+            return songs
+        songs = self.app.search(term, limit)
+        if not songs:
+            return songs
+        self.searches[key] = songs
+        if len(self.searches) > MAX_SEARCHES:
+            self.searches.popitem(last=False)
+        return songs
+
+    def prefetch(self, songs):
+        """Précharge les paroles des premiers résultats (les préchargements précédents sont abandonnés)."""
+        if not self.executor:
+            return
+        wanted = [str(s['id']) for s in songs[:self.prefetch_count]]
+        self.drop(keep=wanted)
+        for song in songs[:self.prefetch_count]:
+            song_id = str(song['id'])
+            if song_id in self.pending:
+                continue
+            dropped = Event()
+            future = self.executor.submit(self.app.get_lyrics_ttml, song['id'], None, dropped.is_set)
+            self.pending[song_id] = (future, dropped)
+
+    def drop(self, keep=()):
+        """Abandonne les préchargements, sauf ceux des ids de keep."""
+        for song_id in [i for i in self.pending if i not in keep]:
+            future, dropped = self.pending.pop(song_id)
+            dropped.set()
+            if future.cancel() or not future.done():
+                self.app.metrics.inc('prefetch_dropped')
+
+    def fetch(self, song):
+        """Télécharge (ou reprend du préchargement) et sauvegarde la chanson choisie. Retourne (succès, message)."""
+        entry = self.pending.pop(str(song['id']), None)
+        self.drop()
+        if entry is not None:
+            with self.app.metrics.timer('process_song'):
+                prefetched = self._prefetched(entry[0])
+                if prefetched is not None:
+                    self.app.metrics.inc('prefetch_used')
+                    return self.app.finish_song(song, *prefetched)
+        return self.app.process_song(song)
+
+    @staticmethod
+    def _prefetched(future):
+        """(ttml, source) d'un préchargement, None s'il a échoué (la chanson est alors téléchargée normalement)."""
+        try:
+            return future.result()
+        except Exception:
+            return None
+
+    def close(self):
+        self.drop()
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+import argparse
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from generate_db import split_lrc_line
+from ttml_convert import parse_seconds
+
+OFFSET_HEADER = re.compile(r'^\[offset:\s*([+-]?\d+)\s*\]$', re.IGNORECASE)
+
+
+class LrcTimeline:
+    """Timeline d'un .lrc, lue une fois, pour retrouver la ligne et le mot chantés à une position de lecture.
+
+    Tout est rangé dans des tableaux compacts triés par temps (array) :
+    - line_starts[i] : début de la ligne i (secondes, [offset:] déjà appliqué) ;
+    - line_agents[i] : indice du chanteur dans agents ("v1", "v2"...), -1 si aucun ;
+    - word_starts[word_bounds[i]:word_bounds[i + 1]] : débuts des mots de la ligne i.
+    Une recherche est une recherche dichotomique (bisect) : O(log n) quel que soit le fichier.
+    """
+
+    def __init__(self, text):
+        self.offset = 0.0
+        entries = []  # (début, ordre, texte, chanteur, [(début, mot)])
+        for raw in text.split('\n'):
+            header = OFFSET_HEADER.match(raw.strip())
+            if header:
+                self.offset = int(header.group(1)) / 1000
+                continue
+            tags, agent, line_text, tagged_words = split_lrc_line(raw)
+            starts = [s for s in map(parse_seconds, tags) if s is not None]
+            if not starts:
+                continue
+            words = [(parse_seconds(tag), word) for tag, word in tagged_words]
+            words = sorted(w for w in words if w[0] is not None)
+            # Une ligne à plusieurs timestamps (refrain) : une entrée par timestamp, mots seulement pour la première
+            for n, start in enumerate(starts):
+                entries.append((start, len(entries), line_text, agent, words if n == 0 else []))
+        entries.sort()
+
+        self.agents = []
+        agent_ids = {}
+        self.lines = []
+        self.words = []
+        self.line_starts = array('d')
+        self.line_agents = array('b')
+        self.word_starts = array('d')
+        self.word_bounds = array('l', [0])
+        for start, _, line_text, agent, words in entries:
+            self.line_starts.append(start - self.offset)
+            self.lines.append(line_text)
+            if agent is not None and agent not in agent_ids:
+                agent_ids[agent] = len(self.agents)
+                self.agents.append(agent)
+            self.line_agents.append(agent_ids[agent] if agent is not None else -1)
+            for word_start, word in words:
+                self.word_starts.append(word_start - self.offset)
+                self.words.append(word)
+            self.word_bounds.append(len(self.words))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read())
+
+    def __len__(self):
+        return len(self.lines)
+
+    def line_at(self, position):
+        """Indice de la ligne en cours à position (secondes), -1 avant la première ligne."""
+        return bisect_right(self.line_starts, position) - 1
+
+    def word_at(self, line, position):
+        """Indice (global, dans words) du mot en cours de la ligne line, -1 si la ligne n'a pas commencé de mot."""
+        if line < 0:
+            return -1
+        lo = self.word_bounds[line]
+        word = bisect_right(self.word_starts, position, lo, self.word_bounds[line + 1]) - 1
+        return word if word >= lo else -1
+
+    def lookup(self, position):
+        """(ligne, mot) en cours à position ; -1 pour "aucun"."""
+        line = bisect_right(self.line_starts, position) - 1
+        return line, self.word_at(line, position)
+
+    def lookup_many(self, positions):
+        """lookup() pour une série de positions (par exemple un affichage par auditeur), dans le même ordre.
+
+        Les positions sont triées puis parcourues avec la timeline : chaque ligne, puis chaque
+        mot, délimite par dichotomie sa tranche de positions, remplie d'un seul bloc. Bien plus
+        rapide que lookup() en boucle sur des positions déjà triées (images successives d'un
+        rendu) ; sinon le tri et la remise dans l'ordre d'origine en reprennent une bonne part.
+        """
+        count = len(positions)
+        order = sorted(range(count), key=positions.__getitem__)
+        ordered = [positions[i] for i in order]
+        starts, word_starts, bounds = self.line_starts, self.word_starts, self.word_bounds
+        result = [(-1, -1)] * count
+        lo = bisect_left(ordered, starts[0]) if starts else count
+        for line in range(len(starts)):
+            hi = bisect_left(ordered, starts[line + 1], lo) if line + 1 < len(starts) else count
+            if hi > lo:
+                first, last = bounds[line], bounds[line + 1]
+                cut = bisect_left(ordered, word_starts[first], lo, hi) if last > first else hi
+                result[lo:cut] = [(line, -1)] * (cut - lo)  # Avant le premier mot de la ligne
+                for word in range(first, last):
+                    end = bisect_left(ordered, word_starts[word + 1], cut, hi) if word + 1 < last else hi
+                    result[cut:end] = [(line, word)] * (end - cut)
+                    cut = end
+            lo = hi
+        if order == list(range(count)):
+            return result  # Positions déjà triées
+        unsorted = [None] * count
+        for i, found in zip(order, result):
+            unsorted[i] = found
+        return unsorted
+
+    def agent(self, line):
+        """Chanteur de la ligne ("v1"...) ou None."""
+        index = self.line_agents[line]
+        return self.agents[index] if index >= 0 else None
+
+    def cursor(self):
+        return SyncCursor(self)
+
+
+class SyncCursor:
+    """Position de lecture d'un auditeur sur une timeline.
+
+    update() est en O(1) tant que la lecture avance normalement (ligne courante ou suivante),
+    et se replie sur une recherche dichotomique après un saut (seek, retour en arrière).
+    """
+
+    def __init__(self, timeline):
+        self.timeline = timeline
+        self.line = -1
+        self.word = -1
+
+    def seek(self, position):
+        self.line, self.word = self.timeline.lookup(position)
+        return self.line, self.word
+
+    def update(self, position):
+        """(ligne, mot) en cours à position, la position précédente servant de point de départ."""
+        starts = self.timeline.line_starts
+        line, count = self.line, len(starts)
+        if line + 1 < count and position >= starts[line + 1]:
+            line += 1  # Lecture normale : ligne suivante
+            if line + 1 < count and position >= starts[line + 1]:
+                return self.seek(position)  # Saut en avant
+        elif line >= 0 and position < starts[line]:
+            return self.seek(position)  # Retour en arrière
+        self.line = line
+        self.word = self.timeline.word_at(line, position)
+        return self.line, self.word
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ligne et mot chantés à une position d'un fichier .lrc")
+    parser.add_argument("file", help="Fichier .lrc (ex: lyrics/Résiste - France Gall.lrc)")
+    parser.add_argument("positions", nargs="*", type=float, help="Positions de lecture en secondes")
+    parser.add_argument("--play", action="store_true", help="Afficher les paroles en temps réel depuis le début")
+    args = parser.parse_args()
+
+    timeline = LrcTimeline.from_file(args.file)
+    if not len(timeline):
+        print("❌ Aucune ligne minutée dans ce fichier.")
+        sys.exit(1)
+
+    for position in args.positions:
+        line, word = timeline.lookup(position)
+        if line < 0:
+            print(f"[{position:7.2f}s] (avant la première ligne)")
+            continue
+        agent = timeline.agent(line)
+        current = f"  → {timeline.words[word]}" if word >= 0 else ""
+        print(f"[{position:7.2f}s] {agent + ': ' if agent else ''}{timeline.lines[line]}{current}")
+
+    if args.play:
+        cursor = timeline.cursor()
+        start = time.monotonic()
+        end = timeline.line_starts[-1] + 5
+        shown = -1
+        try:
+            while time.monotonic() - start < end:
+                line, _ = cursor.update(time.monotonic() - start)
+                if line != shown and line >= 0:
+                    print(f"🎤 {timeline.lines[line]}")
+                    shown = line
+                time.sleep(0.05)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
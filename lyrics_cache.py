@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+import json
+import os
+import sqlite3
+import time
+from threading import Lock
+
+# --- CONFIGURATION ---
+DEFAULT_CACHE_FILE = "lyrics_cache.db"
+NEGATIVE_TTL = 7 * 24 * 3600      # "Pas de paroles" re-testé après 7 jours
+MAX_AGE = 180 * 24 * 3600          # Paroles conservées 6 mois au maximum
+MAX_ENTRIES = 200000               # Au-delà, les entrées les plus anciennes sont évincées
+
+
+class LyricsCache:
+    """Cache disque (SQLite) des TTML téléchargés, indexé par (id catalogue, storefront).
+
+    Il mémorise aussi la chanson trouvée pour chaque terme de recherche du mode batch.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, refresh=False,
+                 negative_ttl=NEGATIVE_TTL, max_age=MAX_AGE, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.refresh = refresh  # Ignore les lectures, mais réécrit les résultats
+        self.negative_ttl = negative_ttl
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.lock = Lock()
+
+        folder = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS lyrics (
+                song_id TEXT NOT NULL,
+                storefront TEXT NOT NULL,
+                ttml TEXT,
+                source TEXT,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (song_id, storefront)
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_lyrics_fetched ON lyrics (fetched_at)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS terms (
+                term TEXT NOT NULL,
+                storefront TEXT NOT NULL,
+                song TEXT,
+                resolved_at REAL NOT NULL,
+                PRIMARY KEY (term, storefront)
+            )""")
+        self.conn.commit()
+        self.evict()
+
+    def get(self, song_id, storefront):
+        """Retourne (trouvé, ttml, source). Un résultat négatif a ttml=None."""
+        if self.refresh:
+            return False, None, None
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT ttml, source, fetched_at FROM lyrics WHERE song_id = ? AND storefront = ?",
+                (str(song_id), storefront)).fetchone()
+        if not row:
+            return False, None, None
+
+        ttml, source, fetched_at = row
+        age = time.time() - fetched_at
+        if ttml is None and age > self.negative_ttl:
+            return False, None, None
+        if age > self.max_age:
+            return False, None, None
+        return True, ttml, source
+
+    def put(self, song_id, storefront, ttml, source):
+        """Enregistre un résultat (ttml=None pour mémoriser l'absence de paroles)."""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO lyrics (song_id, storefront, ttml, source, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (str(song_id), storefront, ttml, source, time.time()))
+            self.conn.commit()
+
+    def get_term(self, term, storefront):
+        """Retourne (trouvé, chanson) pour un terme normalisé. chanson=None : aucun résultat."""
+        if self.refresh:
+            return False, None
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT song, resolved_at FROM terms WHERE term = ? AND storefront = ?",
+                (term, storefront)).fetchone()
+        if not row:
+            return False, None
+
+        song, resolved_at = row
+        age = time.time() - resolved_at
+        if (song is None and age > self.negative_ttl) or age > self.max_age:
+            return False, None
+        return True, json.loads(song) if song else None
+
+    def put_term(self, term, storefront, song):
+        """Enregistre la chanson (dict JSON-sérialisable) trouvée pour un terme, ou None."""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO terms (term, storefront, song, resolved_at) VALUES (?, ?, ?, ?)",
+                (term, storefront, json.dumps(song, ensure_ascii=False) if song else None, time.time()))
+            self.conn.commit()
+
+    def evict(self):
+        """Supprime les entrées expirées puis les plus anciennes au-delà de max_entries."""
+        now = time.time()
+        with self.lock:
+            self.conn.execute("DELETE FROM lyrics WHERE fetched_at < ?", (now - self.max_age,))
+            self.conn.execute("DELETE FROM lyrics WHERE ttml IS NULL AND fetched_at < ?", (now - self.negative_ttl,))
+            self.conn.execute("DELETE FROM terms WHERE resolved_at < ? OR (song IS NULL AND resolved_at < ?)",
+                              (now - self.max_age, now - self.negative_ttl))
+            count = self.conn.execute("SELECT COUNT(*) FROM lyrics").fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute(
+                    "DELETE FROM lyrics WHERE rowid IN (SELECT rowid FROM lyrics ORDER BY fetched_at LIMIT ?)",
+                    (count - self.max_entries,))
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
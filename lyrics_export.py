@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from output_index import lrc_header, safe_filename
+from ttml_archive import DEFAULT_ARCHIVE_FILE, TtmlArchive
+from ttml_convert import lrc_timestamp, parse_ttml, ttml_to_lrc
+
+DEFAULT_EXPORT_DIR = "export"
+CHUNK_SIZE = 200          # Chansons par tâche envoyée à un processus
+DEFAULT_CUE_LENGTH = 3.0  # Durée d'une ligne sans fin connue (SRT/VTT), en secondes
+
+
+def _cue_time(seconds, separator):
+    ms = round(seconds * 1000)
+    h, ms = divmod(ms, 3600000)
+    m, ms = divmod(ms, 60000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{separator}{ms:03d}"
+
+
+def _cues(lines):
+    """(début, fin, texte) de chaque ligne ; une fin absente est déduite des mots ou de la ligne suivante."""
+    cues = []
+    for i, line in enumerate(lines):
+        end = line['end']
+        if end is None and line['words']:
+            end = line['words'][-1]['end']
+        if end is None:
+            end = lines[i + 1]['begin'] if i + 1 < len(lines) else line['begin'] + DEFAULT_CUE_LENGTH
+        cues.append((line['begin'], max(end, line['begin']), line['text']))
+    return cues
+
+
+def render_lrc(ttml, meta):
+    """LRC enrichi (timings par mot) : le format des fichiers téléchargés."""
+    lrc, _ = ttml_to_lrc(ttml)
+    return lrc_header(meta['title'], meta['artist']) + lrc if lrc else None
+
+
+def render_plain(ttml, meta):
+    """LRC simple : un timestamp par ligne, sans timings par mot ni chanteur."""
+    lines = [f"[{lrc_timestamp(line['begin'])}]{line['text']}" for line in parse_ttml(ttml)]
+    return lrc_header(meta['title'], meta['artist']) + "\n".join(lines) if lines else None
+
+
+def render_srt(ttml, meta):
+    cues = _cues(parse_ttml(ttml))
+    blocks = [f"{n}\n{_cue_time(b, ',')} --> {_cue_time(e, ',')}\n{text}\n" for n, (b, e, text) in enumerate(cues, 1)]
+    return "\n".join(blocks) if blocks else None
+
+
+def render_vtt(ttml, meta):
+    cues = _cues(parse_ttml(ttml))
+    if not cues:
+        return None
+    blocks = [f"{_cue_time(b, '.')} --> {_cue_time(e, '.')}\n{text}\n" for b, e, text in cues]
+    return "WEBVTT\n\n" + "\n".join(blocks)
+
+
+def render_json(ttml, meta):
+    """Lignes et timings par mot (secondes)."""
+    lines = parse_ttml(ttml)
+    if not lines:
+        return None
+    return json.dumps(dict(meta, lines=lines), ensure_ascii=False, indent=1)
+
+
+FORMATS = {
+    'lrc': ('.lrc', render_lrc),
+    'plain': ('.lrc', render_plain),
+    'srt': ('.srt', render_srt),
+    'vtt': ('.vtt', render_vtt),
+    'json': ('.json', render_json),
+}
+
+
+def export_chunk(archive_path, jobs):
+    """Tâche d'un processus : lit les TTML de l'archive et écrit chaque format demandé.
+
+    jobs : liste de (métadonnées, [(format, chemin), ...]). Retourne (fichiers écrits, échecs, octets).
+    """
+    archive = TtmlArchive(archive_path, readonly=True)
+    written, failed, size = 0, 0, 0
+    try:
+        by_key = {(meta['id'], meta['storefront']): (meta, targets) for meta, targets in jobs}
+        for song_id, storefront, ttml in archive.iter_ttml(list(by_key)):
+            meta, targets = by_key.pop((song_id, storefront))
+            for fmt, path in targets:
+                try:
+                    content = FORMATS[fmt][1](ttml, meta)
+                except Exception:
+                    content = None
+                if content is None:
+                    failed += 1
+                    continue
+                data = content.encode('utf-8')
+                with open(path, 'wb') as f:
+                    f.write(data)
+                written += 1
+                size += len(data)
+        failed += sum(len(targets) for _, targets in by_key.values())
+    finally:
+        archive.close()
+    return written, failed, size
+
+
+def plan_export(entries, formats, output_dir):
+    """Attribue un nom de fichier par chanson et par format ("Titre - Artiste (1).ext" en cas de doublon).
+
+    Un seul format : fichiers directement dans output_dir ; sinon un sous-dossier par format.
+    """
+    folders = {fmt: output_dir if len(formats) == 1 else os.path.join(output_dir, fmt) for fmt in formats}
+    taken = {fmt: set() for fmt in formats}
+    jobs = []
+    for song_id, storefront, title, artist, source in entries:
+        meta = {'id': song_id, 'storefront': storefront, 'title': title or song_id,
+                'artist': artist or 'Artiste inconnu', 'source': source}
+        targets = []
+        for fmt in formats:
+            ext = FORMATS[fmt][0]
+            base = safe_filename(meta['title'], meta['artist'], '')
+            name, counter = f"{base}{ext}", 1
+            while name.lower() in taken[fmt]:
+                name = f"{base} ({counter}){ext}"
+                counter += 1
+            taken[fmt].add(name.lower())
+            targets.append((fmt, os.path.join(folders[fmt], name)))
+        jobs.append((meta, targets))
+    return jobs, folders
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporte hors ligne les paroles de l'archive TTML (aucune requête réseau)")
+    parser.add_argument("-F", "--format", nargs='+', choices=sorted(FORMATS), default=['lrc'],
+                        help="Formats : lrc (enrichi, comme les téléchargements), plain, srt, vtt, json")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE_FILE, help=f"Archive TTML (défaut: {DEFAULT_ARCHIVE_FILE})")
+    parser.add_argument("-o", "--output", default=DEFAULT_EXPORT_DIR, help=f"Dossier de sortie (défaut: {DEFAULT_EXPORT_DIR})")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="Processus de conversion (défaut: nombre de cœurs)")
+    parser.add_argument("--storefront", help="N'exporter que ce storefront (ex: fr)")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.archive):
+        print(f"❌ Archive '{args.archive}' introuvable. Elle est remplie par apple_lyrics.py --archive.")
+        sys.exit(1)
+
+    archive = TtmlArchive(args.archive, readonly=True)
+    entries = archive.entries(args.storefront)
+    _, size = archive.stats()
+    archive.close()
+    if not entries:
+        print("❌ Archive vide.")
+        return
+
+    formats = list(dict.fromkeys(args.format))
+    jobs, folders = plan_export(entries, formats, args.output)
+    for folder in folders.values():
+        os.makedirs(folder, exist_ok=True)
+
+    print(f"📦 {len(entries)} chansons ({size / 1e6:.1f} Mo compressés) -> {', '.join(formats)} "
+          f"avec {args.jobs} processus...")
+    start = time.perf_counter()
+    chunks = [jobs[i:i + CHUNK_SIZE] for i in range(0, len(jobs), CHUNK_SIZE)]
+    written, failed, total_bytes = 0, 0, 0
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        for n, (w, f, b) in enumerate(executor.map(export_chunk, [args.archive] * len(chunks), chunks), 1):
+            written, failed, total_bytes = written + w, failed + f, total_bytes + b
+            print(f"[{min(n * CHUNK_SIZE, len(jobs))}/{len(jobs)}] {written} fichiers écrits", end='\r')
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✨ Terminé ! {written} fichiers ({total_bytes / 1e6:.1f} Mo) en {elapsed:.1f}s, {failed} échecs.")
+
+
+if __name__ == "__main__":
+    main()
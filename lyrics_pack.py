@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+import json
+import mmap
+import os
+import zlib
+
+PACK_FILE = 'lyrics.pack'        # Contenu de tous les .lrc, bout à bout
+PACK_TABLE = 'lyrics.pack.json'  # Table des offsets : nom -> [offset, longueur, longueur décompressée]
+
+
+def write_pack(filenames, folder, pack_path=PACK_FILE, table_path=PACK_TABLE, compress=False):
+    """Concatène les fichiers de folder dans pack_path et écrit la table des offsets dans table_path.
+
+    Avec compress, chaque entrée est compressée séparément (zlib, "deflate" pour
+    DecompressionStream côté navigateur) : une entrée se lit toujours seule, par
+    une requête HTTP Range ou une tranche de mmap. Retourne la table.
+    """
+    entries = {}
+    offset = 0
+    tmp_path = pack_path + '.tmp'
+    with open(tmp_path, 'wb') as out:
+        for name in filenames:
+            with open(os.path.join(folder, name), 'rb') as f:
+                data = f.read()
+            raw_length = len(data)
+            if compress:
+                data = zlib.compress(data, 9)
+            out.write(data)
+            entries[name] = [offset, len(data), raw_length]
+            offset += len(data)
+
+    table = {
+        "version": 1,
+        "pack": os.path.basename(pack_path),
+        "compression": "deflate" if compress else "none",
+        "size": offset,
+        "entries": entries
+    }
+    # La table n'est remplacée qu'après le pack : elle ne pointe jamais vers un pack incomplet
+    os.replace(tmp_path, pack_path)
+    with open(table_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(table_path + '.tmp', table_path)
+    return table
+
+
+class LyricsPack:
+    """Lecteur d'un pack de paroles (voir write_pack).
+
+    Le pack est projeté en mémoire (mmap) : raw() renvoie une memoryview sur les
+    octets de l'entrée, sans copie ; read() les décode (et décompresse) en texte.
+    """
+
+    def __init__(self, table_path=PACK_TABLE):
+        with open(table_path, 'r', encoding='utf-8') as f:
+            self.table = json.load(f)
+        self.entries = self.table['entries']
+        self.compressed = self.table['compression'] == 'deflate'
+        pack_path = os.path.join(os.path.dirname(table_path), self.table['pack'])
+        self.file = open(pack_path, 'rb')
+        # mmap refuse les fichiers vides
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.table['size'] else None
+        self.view = memoryview(self.map) if self.map else memoryview(b'')
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def names(self):
+        return list(self.entries)
+
+    def raw(self, name):
+        """Octets stockés de l'entrée (compressés si le pack l'est), sans copie. KeyError si absente.
+
+        La memoryview renvoyée doit être libérée (release()) avant close().
+        """
+        offset, length, _ = self.entries[name]
+        return self.view[offset:offset + length]
+
+    def read(self, name):
+        """Contenu texte de l'entrée."""
+        with self.raw(name) as data:
+            if self.compressed:
+                return zlib.decompress(data).decode('utf-8')
+            return str(data, 'utf-8')
+
+    def close(self):
+        self.view.release()
+        if self.map:
+            self.map.close()
+        self.file.close()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+import argparse
+import bisect
+import json
+import os
+import sys
+
+from generate_db import LINES_FOLDER, tokenize
+from ttml_convert import lrc_timestamp, parse_seconds
+
+
+def format_time(tag):
+    """Timestamp LRC de l'index ('mm:ss.xx', 'ss.xxx'...) -> 'mm:ss.xx'."""
+    seconds = parse_seconds(tag)
+    return lrc_timestamp(seconds) if seconds is not None else tag
+
+
+class LyricsSearch:
+    """Recherche de phrases dans les paroles via l'index construit par generate_db.py (search/lines).
+
+    Seuls les shards des mots de la requête et les shards de lignes des fichiers
+    candidats sont lus, puis gardés en mémoire pour les requêtes suivantes.
+    """
+
+    def __init__(self, folder=LINES_FOLDER):
+        self.folder = folder
+        with open(os.path.join(folder, 'manifest.json'), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.prefix = self.manifest['prefix']
+        self.chunk = self.manifest['chunk']
+        self.docs = self.manifest['docs']
+        self.token_shards = {}
+        self.line_shards = {}
+
+    def _load(self, name):
+        with open(os.path.join(self.folder, name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _token_shard(self, key):
+        shard = self.token_shards.get(key)
+        if shard is None:
+            name = self.manifest['shards'].get(key)
+            shard = self._load(name) if name else {"tokens": [], "postings": []}
+            self.token_shards[key] = shard
+        return shard
+
+    def _matches(self, word, prefix):
+        """Postings (listes plates codées) des tokens égaux à word, ou commençant par word si prefix."""
+        shard = self._token_shard(word[:self.prefix])
+        tokens = shard['tokens']
+        i = bisect.bisect_left(tokens, word)
+        found = []
+        while i < len(tokens) and (tokens[i] == word or (prefix and tokens[i].startswith(word))):
+            found.append(shard['postings'][i])
+            i += 1
+        return found
+
+    def lines(self, doc_id):
+        """Lignes [numéro, timestamp, texte] d'un fichier de l'index."""
+        number = doc_id // self.chunk
+        shard = self.line_shards.get(number)
+        if shard is None:
+            shard = self.line_shards[number] = self._load(f"l_{number}.json")
+        return shard[str(doc_id)]
+
+    def search(self, query, limit=None):
+        """Lignes contenant les mots de query à la suite (le dernier mot peut être incomplet).
+
+        Retourne une liste de dicts {filename, line, time ('mm:ss.xx'), text}, dans l'ordre des fichiers.
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        # Un mot plus court que le préfixe des shards ne peut pas être cherché par préfixe
+        last_prefix = len(words[-1]) >= self.prefix
+
+        # Candidats : occurrences du mot le plus rare ; les autres mots sont vérifiés sur le texte
+        candidates = None
+        for n, word in enumerate(words):
+            postings = self._matches(word, prefix=last_prefix and n == len(words) - 1)
+            size = sum(len(p) for p in postings)
+            if candidates is None or size < candidates[0]:
+                candidates = (size, postings)
+            if size == 0:
+                return []
+
+        hits = set()
+        for flat in candidates[1]:
+            doc_id = 0
+            for i in range(0, len(flat), 2):
+                doc_id += flat[i]
+                hits.add((doc_id, flat[i + 1]))
+
+        results = []
+        for doc_id, index in sorted(hits):
+            number, tag, text = self.lines(doc_id)[index]
+            if self._contains(tokenize(text), words, last_prefix):
+                results.append({"filename": self.docs[doc_id], "line": number, "time": format_time(tag), "text": text})
+                if limit and len(results) >= limit:
+                    break
+        return results
+
+    @staticmethod
+    def _contains(tokens, words, last_prefix):
+        size = len(words)
+        for start in range(len(tokens) - size + 1):
+            if tokens[start:start + size - 1] == words[:-1]:
+                last = tokens[start + size - 1]
+                if last == words[-1] or (last_prefix and last.startswith(words[-1])):
+                    return True
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recherche dans les paroles indexées par generate_db.py")
+    parser.add_argument("query", nargs='+', help="Phrase à chercher (ex: on t'organise)")
+    parser.add_argument("-l", "--limit", type=int, default=20, help="Nombre maximum de lignes affichées")
+    parser.add_argument("--index", default=LINES_FOLDER, help="Dossier de l'index plein texte")
+    args = parser.parse_args()
+
+    try:
+        index = LyricsSearch(args.index)
+    except OSError:
+        print(f"❌ Index introuvable dans '{args.index}'. Lancez d'abord : python generate_db.py")
+        sys.exit(1)
+
+    results = index.search(" ".join(args.query), limit=args.limit)
+    if not results:
+        print("❌ Aucune ligne trouvée.")
+        return
+    for r in results:
+        print(f"🎵 {r['filename'][:-len('.lrc')]}  [{r['time']}]  {r['text']}")
+
+
+if __name__ == "__main__":
+    main()
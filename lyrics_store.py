@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from threading import Lock
+
+from output_index import OutputIndex, content_hash, lrc_header, safe_filename
+from sync_manifest import SyncManifest
+from work_queue import set_journal_mode
+
+DEFAULT_STORE_FILE = "lyrics_store.db"
+BUSY_TIMEOUT = 60  # Secondes d'attente du verrou d'écriture tenu par un autre processus
+
+
+class LyricsStore:
+    """Stockage des paroles (LRC) et de leurs métadonnées dans une base SQLite, à la place du dossier de sortie.
+
+    Une ligne par id catalogue, indexée par ISRC, artiste et titre (sans tenir compte
+    de la casse) : retrouver une chanson ne demande plus de parcourir un dossier.
+    Plusieurs processus peuvent écrire dans la même base : chaque écriture attend au
+    plus BUSY_TIMEOUT secondes le verrou d'un autre écrivain. Le journal est en WAL ;
+    network=True le passe en mode "rollback" pour une base sur un partage réseau
+    (voir work_queue.set_journal_mode), au prix d'un débit d'écriture bien plus faible.
+    export() recrée l'arborescence .lrc habituelle.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_FILE, readonly=False, network=False):
+        self.path = path
+        self.lock = Lock()
+        if readonly:
+            self.conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True,
+                                        timeout=BUSY_TIMEOUT, check_same_thread=False)
+            return
+
+        folder = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        set_journal_mode(self.conn, network)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS songs (
+                song_id TEXT PRIMARY KEY,
+                isrc TEXT,
+                title TEXT NOT NULL COLLATE NOCASE,
+                artist TEXT NOT NULL COLLATE NOCASE,
+                album TEXT,
+                source TEXT,
+                digest TEXT NOT NULL,
+                lrc TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_songs_isrc ON songs (isrc)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_songs_artist ON songs (artist, title)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_songs_title ON songs (title)")
+        self.conn.commit()
+
+    def save(self, song, lrc_content, source=None):
+        """Enregistre les paroles d'une chanson (remplace la version précédente si elles ont changé).
+
+        Retourne le nom qu'aura le fichier une fois exporté ("Titre - Artiste.lrc").
+        """
+        attrs = song['attributes']
+        digest = content_hash(lrc_content)
+        with self.lock:
+            with self.conn:  # Transaction : commit, ou rollback en cas d'erreur
+                self.conn.execute(
+                    "INSERT INTO songs (song_id, isrc, title, artist, album, source, digest, lrc, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(song_id) DO UPDATE SET isrc = COALESCE(excluded.isrc, isrc), title = excluded.title, "
+                    "artist = excluded.artist, album = COALESCE(excluded.album, album), source = excluded.source, "
+                    "digest = excluded.digest, lrc = excluded.lrc, updated_at = excluded.updated_at "
+                    "WHERE digest != excluded.digest",
+                    (str(song['id']), (attrs.get('isrc') or '').upper() or None, attrs['name'], attrs['artistName'],
+                     attrs.get('albumName'), source, digest, lrc_content, time.time()))
+        return safe_filename(attrs['name'], attrs['artistName'])
+
+    def has(self, song_id):
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM songs WHERE song_id = ?", (str(song_id),)).fetchone() is not None
+
+    def get(self, song_id):
+        """Retourne le LRC (sans en-tête) d'une chanson, ou None."""
+        with self.lock:
+            row = self.conn.execute("SELECT lrc FROM songs WHERE song_id = ?", (str(song_id),)).fetchone()
+        return row[0] if row else None
+
+    def find(self, song_id=None, isrc=None, artist=None, title=None, limit=None):
+        """Chansons correspondant à tous les critères donnés : liste de (id, isrc, titre, artiste, album, source).
+
+        artist est comparé exactement (sans la casse), title par préfixe (sans la casse).
+        """
+        clauses, params = [], []
+        if song_id:
+            clauses.append("song_id = ?")
+            params.append(str(song_id))
+        if isrc:
+            clauses.append("isrc = ?")
+            params.append(isrc.upper())
+        if artist:
+            clauses.append("artist = ?")
+            params.append(artist)
+        if title:
+            clauses.append("title LIKE ? ESCAPE '\\'")
+            params.append(title.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+        query = "SELECT song_id, isrc, title, artist, album, source FROM songs"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY artist, title"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        with self.lock:
+            return self.conn.execute(query, params).fetchall()
+
+    def iter_songs(self, batch=500):
+        """Génère (id, titre, artiste, lrc) par lots, dans l'ordre artiste/titre, sans tout charger en mémoire."""
+        last = ('', '', '')
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    "SELECT artist, title, song_id, lrc FROM songs WHERE (artist, title, song_id) > (?, ?, ?) "
+                    "ORDER BY artist, title, song_id LIMIT ?", last + (batch,)).fetchall()
+            if not rows:
+                return
+            for artist, title, song_id, lrc in rows:
+                yield song_id, title, artist, lrc
+            last = rows[-1][:3]
+
+    def stats(self):
+        """(nombre de chansons, nombre d'artistes)."""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*), COUNT(DISTINCT artist) FROM songs").fetchone()
+
+    def export(self, output_dir, progress=None):
+        """Écrit chaque chanson en "Titre - Artiste.lrc" dans output_dir, comme un téléchargement direct.
+
+        Doublons et noms "(1)" gérés par OutputIndex ; le manifeste de synchronisation du dossier
+        est tenu à jour (un téléchargement ultérieur dans ce dossier reprend sans tout refaire).
+        Retourne le nombre de fichiers écrits ou déjà présents.
+        """
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        index = OutputIndex(output_dir)
+        manifest = SyncManifest(output_dir)
+        count = 0
+        try:
+            for song_id, title, artist, lrc in self.iter_songs():
+                path = index.save(safe_filename(title, artist), lrc_header(title, artist), lrc)
+                manifest.record(song_id, 'ok', path, content_hash(lrc))
+                count += 1
+                if progress:
+                    progress(count)
+        finally:
+            manifest.close()
+        return count
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consulte ou exporte la base de paroles (apple_lyrics.py --store)")
+    parser.add_argument("--store", default=DEFAULT_STORE_FILE, help=f"Base de paroles (défaut: {DEFAULT_STORE_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    find = commands.add_parser("find", help="Rechercher des chansons par id, ISRC, artiste ou début de titre")
+    find.add_argument("--id")
+    find.add_argument("--isrc")
+    find.add_argument("--artist")
+    find.add_argument("--title")
+    find.add_argument("-l", "--limit", type=int, default=50)
+    show = commands.add_parser("show", help="Afficher les paroles d'une chanson")
+    show.add_argument("id")
+    export = commands.add_parser("export", help="Exporter en fichiers .lrc (même arborescence que le dossier de sortie)")
+    export.add_argument("-o", "--output", default="lyrics", help="Dossier de sortie (défaut: lyrics)")
+    commands.add_parser("stats", help="Nombre de chansons et d'artistes")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.store):
+        print(f"❌ Base '{args.store}' introuvable. Elle est remplie par apple_lyrics.py --store.")
+        sys.exit(1)
+    store = LyricsStore(args.store, readonly=True)
+
+    try:
+        if args.command == "find":
+            rows = store.find(args.id, args.isrc, args.artist, args.title, args.limit)
+            for song_id, isrc, title, artist, album, source in rows:
+                print(f"🎵 {title} - {artist}" + (f" ({album})" if album else "") + f"  [id {song_id}"
+                      + (f", ISRC {isrc}" if isrc else "") + f", {source or '?'}]")
+            if not rows:
+                print("❌ Aucune chanson trouvée.")
+        elif args.command == "show":
+            lrc = store.get(args.id)
+            if lrc is None:
+                print("❌ Chanson introuvable.")
+                sys.exit(1)
+            print(lrc)
+        elif args.command == "stats":
+            songs, artists = store.stats()
+            print(f"📦 {songs} chansons, {artists} artistes ({os.path.getsize(args.store) / 1e6:.1f} Mo)")
+        else:
+            start = time.perf_counter()
+            total = store.stats()[0]
+            count = store.export(args.output, progress=lambda n: print(f"[{n}/{total}]", end='\r') if n % 500 == 0 else None)
+            print(f"✨ {count} chansons exportées dans '{args.output}' en {time.perf_counter() - start:.1f}s.")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+import cProfile
+import json
+import math
+import pstats
+import time
+from contextlib import contextmanager
+from threading import Lock
+
+# Bornes des histogrammes de latence (secondes), comme les buckets Prometheus
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    def __init__(self, keep_samples=False):
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # Dernier bucket : au-delà de la plus grande borne
+        self.samples = [] if keep_samples else None  # Valeurs exactes (Metrics.keep_samples)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        if self.samples is not None:
+            self.samples.append(value)
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def quantile(self, q):
+        """Quantile q : exact si les valeurs sont gardées, sinon borne supérieure du bucket qui le contient."""
+        if self.samples:
+            ordered = sorted(self.samples)
+            return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]  # Rang le plus proche
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max
+        return 0.0
+
+    def to_dict(self):
+        report = {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": round(self.quantile(0.5), 6),
+            "p95": round(self.quantile(0.95), 6),
+            "max": round(self.max, 6),
+            "buckets": {str(b): n for b, n in zip(list(BUCKETS) + ["+Inf"], self.buckets)}
+        }
+        if self.samples is not None:
+            report["samples"] = [round(v, 6) for v in self.samples]
+        return report
+
+
+class _RawStats:
+    """Adapte un dict Profile.stats à pstats.Stats (qui attend un objet create_stats()/stats)."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class Metrics:
+    """Mesures d'un run : histogrammes de latence par phase, compteurs, statuts HTTP, octets reçus,
+    taux d'occupation des workers, et profil cProfile optionnel de la conversion.
+
+    Toutes les méthodes sont utilisables depuis plusieurs threads.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.started = time.time()
+        self.histograms = {}
+        self.sampled = set()  # Phases dont chaque valeur est gardée (keep_samples)
+        self.counters = {}
+        self.http_status = {}
+        self.bytes_received = 0
+        self.stages = {}
+        self.profile_stats = None
+        self.profile_lock = None  # Créé par enable_profiling()
+
+    def keep_samples(self, *names):
+        """Garde chaque valeur mesurée de ces phases : quantiles exacts et liste "samples" dans le rapport."""
+        with self.lock:
+            self.sampled.update(names)
+
+    def observe(self, name, seconds):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(keep_samples=name in self.sampled)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def inc(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def http(self, status, nbytes=0):
+        """Compte une réponse HTTP (status=None : erreur réseau) et sa taille."""
+        key = str(status) if status is not None else "error"
+        with self.lock:
+            self.http_status[key] = self.http_status.get(key, 0) + 1
+            self.bytes_received += nbytes
+
+    def _busy(self, name):
+        histogram = self.histograms.get(name)
+        return histogram.sum if histogram else 0.0
+
+    @contextmanager
+    def stage(self, name, workers, busy='process_song'):
+        """Mesure la durée d'une étape parallèle et l'occupation de ses workers.
+
+        L'occupation est le temps passé dans l'histogramme `busy` pendant l'étape,
+        rapporté à workers x durée.
+        """
+        with self.lock:
+            busy_start = self._busy(busy)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            with self.lock:
+                busy_time = self._busy(busy) - busy_start
+                self.stages[name] = {
+                    "workers": workers,
+                    "wall_seconds": round(wall, 3),
+                    "busy_seconds": round(busy_time, 3),
+                    "utilization": round(busy_time / (workers * wall), 3) if wall and workers else 0.0
+                }
+
+    # --- Profil ---
+
+    def enable_profiling(self):
+        self.profile_lock = Lock()
+
+    def profiled(self, fn, *args):
+        """Appelle fn(*args), sous cProfile si enable_profiling() a été appelé.
+
+        cProfile ne suit que le thread courant et un seul profileur peut être actif :
+        les appels profilés sont donc sérialisés, puis leurs statistiques cumulées.
+        """
+        if self.profile_lock is None:
+            return fn(*args)
+        with self.profile_lock:
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(fn, *args)
+            finally:
+                profiler.create_stats()
+                self.add_profile(profiler.stats)
+
+    def add_profile(self, stats):
+        """Cumule des statistiques cProfile brutes (Profile.stats), par exemple calculées dans un autre processus."""
+        with self.lock:
+            if self.profile_stats is None:
+                self.profile_stats = pstats.Stats(_RawStats(stats))
+            else:
+                self.profile_stats.add(_RawStats(stats))
+
+    def dump_profile(self, path):
+        """Écrit le profil cumulé (lisible avec `python -m pstats path` ou snakeviz). False si rien n'a été profilé."""
+        if self.profile_stats is None:
+            return False
+        self.profile_stats.dump_stats(path)
+        return True
+
+    # --- Export ---
+
+    def to_dict(self, extra=None):
+        with self.lock:
+            report = {
+                "started_at": self.started,
+                "duration_seconds": round(time.time() - self.started, 3),
+                "phases": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "http_status": dict(sorted(self.http_status.items())),
+                "bytes_received": self.bytes_received,
+                "stages": dict(self.stages)
+            }
+        if extra:
+            report.update(extra)
+        return report
+
+    def to_prometheus(self, extra=None):
+        """Format texte d'exposition Prometheus."""
+        report = self.to_dict()
+        lines = ["# TYPE lyrics_phase_seconds histogram"]
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+            for name, h in histograms:
+                cumulative = 0
+                for bound, n in zip(list(BUCKETS) + ["+Inf"], h.buckets):
+                    cumulative += n
+                    lines.append(f'lyrics_phase_seconds_bucket{{phase="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'lyrics_phase_seconds_sum{{phase="{name}"}} {h.sum:.6f}')
+                lines.append(f'lyrics_phase_seconds_count{{phase="{name}"}} {h.count}')
+        lines.append("# TYPE lyrics_events_total counter")
+        for name, n in report["counters"].items():
+            lines.append(f'lyrics_events_total{{event="{name}"}} {n}')
+        lines.append("# TYPE lyrics_http_responses_total counter")
+        for status, n in report["http_status"].items():
+            lines.append(f'lyrics_http_responses_total{{status="{status}"}} {n}')
+        lines.append("# TYPE lyrics_http_received_bytes_total counter")
+        lines.append(f"lyrics_http_received_bytes_total {report['bytes_received']}")
+        lines.append("# TYPE lyrics_worker_utilization gauge")
+        for name, stage in report["stages"].items():
+            lines.append(f'lyrics_worker_utilization{{stage="{name}",workers="{stage["workers"]}"}} {stage["utilization"]}')
+        # Valeurs supplémentaires (ex: statistiques du contrôleur de débit), aplaties sur un niveau
+        for name, value in (extra or {}).items():
+            values = value.items() if isinstance(value, dict) else [(None, value)]
+            for key, v in values:
+                if isinstance(v, (int, float)):
+                    lines.append(f"lyrics_{name}_{key} {v}" if key else f"lyrics_{name} {v}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path, extra=None):
+        """Écrit le rapport : texte Prometheus si path finit par .prom ou .txt, sinon JSON."""
+        if path.endswith(('.prom', '.txt')):
+            content = self.to_prometheus(extra)
+        else:
+            content = json.dumps(self.to_dict(extra), indent=2, ensure_ascii=False)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def summary(self, names=('search', 'pagination', 'lyrics_attempt', 'ttml_to_lrc', 'save_to_file', 'save_lock_wait')):
+        """Résumé d'une ligne par phase mesurée."""
+        lines = []
+        with self.lock:
+            for name in names:
+                h = self.histograms.get(name)
+                if h and h.count:
+                    lines.append(f"⏱️ {name}: {h.count} appels, moyenne {h.sum / h.count * 1000:.1f} ms, "
+                                 f"p95 ≤ {h.quantile(0.95) * 1000:.0f} ms, total {h.sum:.1f}s")
+            for name, stage in self.stages.items():
+                lines.append(f"⏱️ {name}: {stage['wall_seconds']}s, occupation des {stage['workers']} workers "
+                             f"{stage['utilization'] * 100:.0f}%")
+        return "\n".join(lines)
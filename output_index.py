@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+import hashlib
+import os
+import re
+import threading
+import time
+from threading import Lock
+
+HEADER_LINE = re.compile(r'^\[[A-Za-z]+:.*\]$')
+UNSAFE_CHARS = re.compile(r'[\\/*?:"<>|]')
+MAX_NAME = 80
+
+
+def safe_filename(title, artist, ext='.lrc'):
+    """Nom de fichier "Titre - Artiste.ext" valide sous Windows, chaque partie tronquée à MAX_NAME caractères."""
+    safe_title = UNSAFE_CHARS.sub("", title).strip()[:MAX_NAME].strip()
+    safe_artist = UNSAFE_CHARS.sub("", artist).strip()[:MAX_NAME].strip()
+    return f"{safe_title} - {safe_artist}{ext}"
+
+
+def lrc_header(title, artist):
+    return f"[ti:{title}]\n[ar:{artist}]\n[offset:0]\n"
+
+
+def content_hash(lrc_content):
+    """Hash des paroles, hors en-têtes ([ti:], [ar:], [offset:]...) et espaces de fin."""
+    return hashlib.sha1(lrc_content.strip().encode('utf-8')).hexdigest()
+
+
+def lrc_body(text):
+    """Retire les lignes d'en-tête d'un fichier .lrc."""
+    lines = text.split('\n')
+    start = 0
+    while start < len(lines) and HEADER_LINE.match(lines[start]):
+        start += 1
+    return '\n'.join(lines[start:])
+
+
+class OutputIndex:
+    """Index en mémoire du dossier de sortie pour la déduplication des fichiers .lrc.
+
+    La liste des noms est lue une fois au démarrage ; les hash de contenu d'une
+    famille de noms ("Titre - Artiste.lrc", "Titre - Artiste (1).lrc"...) sont
+    calculés à sa première utilisation puis tenus à jour à chaque écriture.
+    Les verrous sont par famille de noms : deux chansons différentes ne
+    s'attendent jamais.
+    metrics (optionnel, voir metrics.Metrics) reçoit le temps d'attente des verrous.
+    """
+
+    def __init__(self, output_dir, metrics=None):
+        self.output_dir = output_dir
+        self.metrics = metrics
+        self.names = {os.path.normcase(n) for n in os.listdir(output_dir)}
+        self.groups = {}      # famille -> {hash: chemin}
+        self.locks = {}
+        self.locks_lock = Lock()
+
+    def _lock_for(self, key):
+        with self.locks_lock:
+            lock = self.locks.get(key)
+            if lock is None:
+                lock = self.locks[key] = Lock()
+            return lock
+
+    def _candidates(self, base_name, ext):
+        """Noms de la famille, dans l'ordre de probing : base.ext, base (1).ext, ..."""
+        yield f"{base_name}{ext}"
+        counter = 1
+        while True:
+            yield f"{base_name} ({counter}){ext}"
+            counter += 1
+
+    def _load_group(self, base_name, ext):
+        group = {}
+        for name in self._candidates(base_name, ext):
+            if os.path.normcase(name) not in self.names:
+                break
+            path = os.path.join(self.output_dir, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    group.setdefault(content_hash(lrc_body(f.read())), path)
+            except (OSError, UnicodeDecodeError):
+                pass
+        return group
+
+    def save(self, filename, header, lrc_content):
+        """Écrit header + lrc_content sous filename (ou "filename (n)").
+
+        Retourne le chemin du fichier, existant si un fichier de la même famille
+        a déjà ce contenu. L'écriture passe par un fichier temporaire, lié sous son nom
+        définitif seulement si ce nom est libre (voir _claim).
+        """
+        base_name, ext = os.path.splitext(filename)
+        key = os.path.normcase(base_name)
+        digest = content_hash(lrc_content)
+
+        lock = self._lock_for(key)
+        start = time.perf_counter()
+        with lock:
+            if self.metrics:
+                self.metrics.observe('save_lock_wait', time.perf_counter() - start)
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = self._load_group(base_name, ext)
+            if digest in group:
+                return group[digest]
+
+            tmp_path = os.path.join(self.output_dir, f".{base_name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(header + lrc_content)
+                for name in self._candidates(base_name, ext):
+                    if os.path.normcase(name) in self.names:
+                        continue
+                    filepath = os.path.join(self.output_dir, name)
+                    existing = self._claim(tmp_path, filepath)
+                    self.names.add(os.path.normcase(name))
+                    if existing is None:
+                        break
+                    # Nom pris entre-temps par un autre processus (worker) : même contenu, ou nom suivant
+                    if existing == digest:
+                        group[digest] = filepath
+                        return filepath
+                    if existing:
+                        group.setdefault(existing, filepath)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+            group[digest] = filepath
+            return filepath
+
+    @staticmethod
+    def _claim(tmp_path, filepath):
+        """Donne le nom filepath au fichier temporaire, s'il est libre.
+
+        os.link échoue si le nom existe déjà : entre plusieurs processus écrivant dans le même
+        dossier (apple_lyrics.py --worker), un seul obtient un nom donné, sans rien écraser.
+        Retourne None si le nom est obtenu, sinon le hash du fichier qui le porte déjà ('' s'il est illisible).
+        Sur un système de fichiers sans liens physiques (FAT, certains partages SMB), le nom est
+        réservé par une création exclusive (O_CREAT | O_EXCL) puis rempli : jamais d'écrasement.
+        """
+        try:
+            try:
+                os.link(tmp_path, filepath)
+            except OSError as e:
+                if isinstance(e, FileExistsError):
+                    raise
+                OutputIndex._create_exclusive(tmp_path, filepath)
+            return None
+        except FileExistsError:
+            try:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    return content_hash(lrc_body(f.read()))
+            except (OSError, UnicodeDecodeError):
+                return ''
+
+    @staticmethod
+    def _create_exclusive(tmp_path, filepath):
+        """Crée filepath (FileExistsError s'il existe déjà) avec le contenu du fichier temporaire."""
+        with open(tmp_path, 'rb') as f:
+            data = f.read()
+        fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+        except BaseException:
+            os.remove(filepath)  # Pas de fichier à moitié écrit sous le nom définitif
+            raise
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from threading import Condition
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+MAX_RETRIES = 5
+BASE_DELAY = 0.5
+MAX_DELAY = 60.0
+DECREASE_COOLDOWN = 1.0  # Une seule réduction par seconde, même si plusieurs 429 arrivent ensemble
+
+
+class RateController:
+    """Contrôle de débit partagé par toutes les requêtes vers l'API.
+
+    - Nouvelles tentatives sur 429/5xx/erreurs réseau, backoff exponentiel avec jitter.
+    - Respect de Retry-After : toutes les requêtes sont suspendues jusqu'à l'échéance.
+    - Nombre de requêtes en vol ajusté en AIMD : +1 par fenêtre de succès, /2 sur throttling.
+    """
+
+    def __init__(self, max_limit, min_limit=1, max_retries=MAX_RETRIES):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.max_retries = max_retries
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.pause_until = 0.0
+        self.last_decrease = 0.0
+        self.cond = Condition()
+        self.async_waiters = []  # (boucle, future) des acquire_async en attente d'une place, réveillés par release()
+        self.stats = {
+            'requests': 0,
+            'retries': 0,
+            'throttled': 0,
+            'server_errors': 0,
+            'network_errors': 0,
+            'paused_seconds': 0.0,
+            'lowest_limit': self.max_limit,
+        }
+
+    # --- Admission ---
+
+    def _can_start(self):
+        return self.in_flight < int(self.limit) and time.monotonic() >= self.pause_until
+
+    def try_acquire(self):
+        with self.cond:
+            if not self._can_start():
+                return False
+            self.in_flight += 1
+            return True
+
+    def acquire(self):
+        with self.cond:
+            while not self._can_start():
+                self.cond.wait(timeout=max(0.01, self.pause_until - time.monotonic()))
+            self.in_flight += 1
+
+    async def acquire_async(self):
+        """Équivalent asyncio de acquire() : attend qu'une place se libère (release) ou la fin d'une pause Retry-After."""
+        while True:
+            with self.cond:
+                if self._can_start():
+                    self.in_flight += 1
+                    return
+                pause = self.pause_until - time.monotonic()
+                if pause <= 0:
+                    loop = asyncio.get_running_loop()
+                    waiter = loop.create_future()
+                    self.async_waiters.append((loop, waiter))
+            if pause > 0:
+                await asyncio.sleep(pause)
+            else:
+                await waiter
+
+    @staticmethod
+    def _wake(waiter):
+        if not waiter.done():
+            waiter.set_result(None)
+
+    def release(self, status):
+        """Libère une place et ajuste la limite selon le statut (None = erreur réseau)."""
+        now = time.monotonic()
+        with self.cond:
+            self.in_flight -= 1
+            self.stats['requests'] += 1
+            if status is None:
+                self.stats['network_errors'] += 1
+            elif status in THROTTLE_STATUSES:
+                self.stats['throttled'] += 1
+                if now - self.last_decrease >= DECREASE_COOLDOWN:
+                    self.limit = max(self.min_limit, self.limit / 2)
+                    self.last_decrease = now
+                    self.stats['lowest_limit'] = min(self.stats['lowest_limit'], int(self.limit))
+            else:
+                if status >= 500:
+                    self.stats['server_errors'] += 1
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self.cond.notify_all()
+            # release() peut venir d'un autre thread que celui de la boucle des waiters
+            for loop, waiter in self.async_waiters:
+                loop.call_soon_threadsafe(self._wake, waiter)
+            self.async_waiters.clear()
+
+    # --- Nouvelles tentatives ---
+
+    @staticmethod
+    def parse_retry_after(value):
+        """Retry-After en secondes ou date HTTP. Retourne None si absent/illisible."""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def backoff(self, attempt, retry_after=None):
+        """Délai avant la tentative suivante. Un Retry-After suspend toutes les requêtes."""
+        wait = self.parse_retry_after(retry_after)
+        with self.cond:
+            self.stats['retries'] += 1
+            if wait is not None:
+                wait = min(wait, MAX_DELAY)
+                now = time.monotonic()
+                if now + wait > self.pause_until:
+                    self.stats['paused_seconds'] += now + wait - max(now, self.pause_until)
+                    self.pause_until = now + wait
+                return wait
+        return random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt))  # "Full jitter"
+
+    def request(self, send):
+        """Exécute send() (qui retourne une réponse HTTP) avec admission et nouvelles tentatives."""
+        for attempt in range(self.max_retries + 1):
+            self.acquire()
+            try:
+                res = send()
+            except Exception:
+                self.release(None)
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff(attempt))
+                continue
+            self.release(res.status_code)
+            if res.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return res
+            time.sleep(self.backoff(attempt, res.headers.get('Retry-After')))
+
+    async def request_async(self, send):
+        """Équivalent asyncio de request() ; send() retourne une coroutine."""
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async()
+            try:
+                res = await send()
+            except Exception:
+                self.release(None)
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+            self.release(res.status_code)
+            if res.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return res
+            await asyncio.sleep(self.backoff(attempt, res.headers.get('Retry-After')))
+
+    def summary(self):
+        s = self.stats
+        return (f"📊 {s['requests']} requêtes, {s['retries']} nouvelles tentatives, "
+                f"{s['throttled']} limitées (429/503), {s['server_errors']} erreurs serveur, "
+                f"{s['network_errors']} erreurs réseau, {s['paused_seconds']:.1f}s de pause Retry-After, "
+                f"concurrence min {s['lowest_limit']}/{self.max_limit}.")
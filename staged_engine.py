@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+import cProfile
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock, Semaphore, Thread
+
+from ttml_convert import ttml_to_lrc
+
+WRITE_WORKERS = 2
+_DONE = object()
+
+
+def convert(ttml, profile=False):
+    """Conversion exécutée dans un processus du pool. Retourne (lrc, durée, stats cProfile ou None)."""
+    start = time.perf_counter()
+    if profile:
+        profiler = cProfile.Profile()
+        lrc, _ = profiler.runcall(ttml_to_lrc, ttml)
+        profiler.create_stats()
+        return lrc, time.perf_counter() - start, profiler.stats
+    lrc, _ = ttml_to_lrc(ttml)
+    return lrc, time.perf_counter() - start, None
+
+
+class StagedLyricsEngine:
+    """Moteur en trois étapes, chacune avec ses workers et sa file bornée :
+
+    1. réseau : `fetch_workers` threads récupèrent les TTML (cache, puis API) ;
+    2. conversion : `convert_workers` processus exécutent ttml_to_lrc, hors du GIL
+       des threads réseau ;
+    3. écriture : `write_workers` threads sauvegardent les .lrc (AppleMusicLyrics.store_song).
+
+    Au plus `queue_size` chansons attendent entre deux étapes : une étape lente
+    freine les précédentes au lieu d'accumuler les TTML en mémoire.
+    """
+
+    def __init__(self, app, fetch_workers=10, convert_workers=None, write_workers=WRITE_WORKERS, queue_size=None):
+        self.app = app
+        self.fetch_workers = max(1, fetch_workers)
+        self.convert_workers = max(1, convert_workers or os.cpu_count() or 1)
+        self.write_workers = max(1, write_workers)
+        self.queue_size = max(1, queue_size or 2 * (self.fetch_workers + self.convert_workers))
+        self.profile = app.metrics.profile_lock is not None  # --profile : profil calculé dans les processus
+        self.result_lock = Lock()
+
+    def run(self, songs, on_result):
+        """Traite les chansons (itérable, lu au fur et à mesure) ; on_result(succès, message) est appelé pour chacune (un appel à la fois)."""
+        metrics = self.app.metrics
+        fetch_queue = queue.Queue(maxsize=self.queue_size)
+        write_queue = queue.Queue(maxsize=self.queue_size)
+        converting = Semaphore(self.queue_size)
+
+        def report(success, message):
+            with self.result_lock:
+                on_result(success, message)
+
+        def converted(song, ttml, source, future):
+            try:
+                lrc, elapsed, stats = future.result()
+                metrics.observe('ttml_to_lrc', elapsed)
+                if stats:
+                    metrics.add_profile(stats)
+                write_queue.put((song, ttml, lrc, source, None))
+            except Exception as exc:
+                write_queue.put((song, ttml, None, source, exc))
+            finally:
+                converting.release()
+
+        def fetcher(pool):
+            while True:
+                song = fetch_queue.get()
+                if song is _DONE:
+                    return
+                try:
+                    with metrics.timer('fetch_song'):
+                        ttml, source = self.app.get_lyrics_ttml(song['id'], song.get('lyricsHint'),
+                                                                cached=song.get('lyricsCache'))
+                except Exception as exc:
+                    write_queue.put((song, None, None, None, exc))
+                    continue
+                if not ttml:
+                    write_queue.put((song, None, None, source, None))
+                    continue
+                converting.acquire()
+                try:
+                    future = pool.submit(convert, ttml, self.profile)
+                except Exception as exc:  # Pool cassé (processus tué...)
+                    converting.release()
+                    write_queue.put((song, ttml, None, source, exc))
+                    continue
+                future.add_done_callback(lambda f, s=song, t=ttml, src=source: converted(s, t, src, f))
+
+        def writer():
+            while True:
+                item = write_queue.get()
+                if item is _DONE:
+                    return
+                song, ttml, lrc, source, exc = item
+                if exc is not None:
+                    report(False, f"❌ Exception générée: {exc}")
+                    continue
+                with metrics.timer('store_song'):
+                    result = self.app.store_song(song, ttml, lrc, source)
+                report(*result)
+
+        writers = [Thread(target=writer, daemon=True) for _ in range(self.write_workers)]
+        for t in writers:
+            t.start()
+
+        with metrics.stage('fetch', self.fetch_workers, busy='fetch_song'), \
+                metrics.stage('convert', self.convert_workers, busy='ttml_to_lrc'), \
+                metrics.stage('write', self.write_workers, busy='store_song'):
+            # spawn : pas de fork d'un processus dont d'autres threads tiennent des verrous
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=self.convert_workers, mp_context=context) as pool:
+                fetchers = [Thread(target=fetcher, args=(pool,), daemon=True) for _ in range(self.fetch_workers)]
+                for t in fetchers:
+                    t.start()
+                for song in songs:
+                    fetch_queue.put(song)
+                for _ in fetchers:
+                    fetch_queue.put(_DONE)
+                for t in fetchers:
+                    t.join()
+            # Sortie du with : toutes les conversions sont terminées et leurs résultats en file d'écriture
+            for _ in writers:
+                write_queue.put(_DONE)
+            for t in writers:
+                t.join()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import json
+import os
+import time
+from threading import Lock
+
+MANIFEST_FILENAME = ".sync_manifest.jsonl"
+
+
+class SyncManifest:
+    """Journal (JSON Lines) des chansons déjà traitées dans un dossier de sortie.
+
+    Chaque ligne est ajoutée dès qu'une chanson est terminée : un sync interrompu
+    reprend donc là où il s'est arrêté. La dernière ligne d'un id l'emporte.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_FILENAME)
+        self.lock = Lock()
+        self.entries = {}
+
+        line_count = self._load()
+        # Compactage si le journal contient surtout des lignes remplacées
+        if line_count > 2 * len(self.entries) + 1000:
+            self._compact()
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return 0
+        line_count = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line_count += 1
+                try:
+                    entry = json.loads(line)
+                    self.entries[entry['id']] = entry
+                except (ValueError, KeyError):
+                    continue  # Dernière ligne tronquée par un arrêt brutal
+        return line_count
+
+    def _compact(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def is_done(self, catalog_id):
+        """Vrai si la chanson a déjà été sauvegardée et que son fichier existe toujours."""
+        entry = self.entries.get(str(catalog_id))
+        if not entry or entry.get('status') != 'ok' or not entry.get('path'):
+            return False
+        return os.path.exists(os.path.join(self.output_dir, entry['path']))
+
+    def record(self, catalog_id, status, path=None, content_hash=None):
+        """Enregistre le résultat d'une chanson ('ok', 'no_lyrics', 'error')."""
+        entry = {
+            'id': str(catalog_id),
+            'status': status,
+            'path': os.path.relpath(path, self.output_dir) if path else None,
+            'hash': content_hash,
+            'time': int(time.time())
+        }
+        with self.lock:
+            self.entries[entry['id']] = entry
+            self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
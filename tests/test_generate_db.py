@@ -0,0 +1,104 @@
+"""Format, temps de construction et taille de l'index de recherche titre/artiste (generate_db.build_search_index)."""
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import generate_db  # noqa: E402
+
+SYLLABLES = ["ré", "sis", "te", "mon", "fils", "ba", "tail", "le", "feel", "ing", "gall", "fran", "ce",
+             "é", "lo", "ï", "ka", "ra", "o", "ke", "nuit", "jour", "cœur", "amour", "l'", "été", "ça"]
+
+
+def synthetic_entries(count, seed=1):
+    rng = random.Random(seed)
+
+    def words(n):
+        return " ".join("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))) for _ in range(n))
+
+    entries = []
+    for i in range(count):
+        title, artist = words(rng.randint(1, 4)).capitalize(), words(rng.randint(1, 2)).title()
+        entries.append({"filename": f"{title} - {artist} ({i}).lrc", "title": title, "artist": artist})
+    return sorted(entries, key=lambda e: e["filename"])
+
+
+def load(folder, name):
+    with open(os.path.join(folder, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def doc_files(manifest):
+    return [f"d_{n}.json" for n in range(-(-manifest["docs"] // manifest["chunk"]))]
+
+
+def test_fold_removes_accents_and_marks():
+    assert generate_db.fold("Résiste") == "resiste"
+    assert generate_db.tokenize("L'été, ça!") == ["l", "ete", "ca"]
+    assert generate_db.fold("กั") == "ก"  # Marque sans classe combinante : retirée comme dans app.js (\p{M})
+
+
+def test_search_index_format(tmp_path):
+    entries = synthetic_entries(1200)
+    manifest = generate_db.build_search_index(entries, str(tmp_path), chunk=500)
+
+    assert manifest["version"] == generate_db.INDEX_VERSION
+    assert manifest["docs"] == len(entries) and manifest["chunk"] == 500
+    assert load(tmp_path, "manifest.json") == manifest
+
+    for key, info in manifest["shards"].items():
+        shard = load(tmp_path, info["file"])
+        assert set(shard) == {"tokens", "postings"}  # Pas de métadonnées recopiées dans les shards
+        tokens = shard["tokens"]
+        assert tokens == sorted(tokens)
+        assert len(tokens) == len(shard["postings"]) == info["tokens"]
+        assert all(t[:manifest["prefix"]] == key and len(t) >= manifest["prefix"] for t in tokens)
+        for ids in shard["postings"]:
+            assert ids == sorted(set(ids))
+            assert all(0 <= i < len(entries) for i in ids)
+        assert len({i for ids in shard["postings"] for i in ids}) == info["docs"]
+
+    docs = [doc for name in doc_files(manifest) for doc in load(tmp_path, name)]
+    assert docs == [[e["title"], e["artist"], e["filename"]] for e in entries]
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        ["manifest.json"] + doc_files(manifest) + [i["file"] for i in manifest["shards"].values()])
+
+
+def test_search_index_lookup(tmp_path):
+    entries = [{"filename": "Résiste - France Gall.lrc", "title": "Résiste", "artist": "France Gall"},
+               {"filename": "I Gotta Feeling - Black Eyed Peas.lrc", "title": "I Gotta Feeling", "artist": "Black Eyed Peas"}]
+    manifest = generate_db.build_search_index(entries, str(tmp_path))
+    shard = load(tmp_path, manifest["shards"]["re"]["file"])
+    assert shard["postings"][shard["tokens"].index("resiste")] == [0]
+    assert "i" not in manifest["shards"]  # Mot d'une lettre : ignoré par le front, pas de shard
+
+
+def test_search_index_build_time_and_size(tmp_path):
+    entries = synthetic_entries(5000)
+    start = time.perf_counter()
+    manifest = generate_db.build_search_index(entries, str(tmp_path))
+    elapsed = time.perf_counter() - start
+
+    shard_sizes = [os.path.getsize(os.path.join(tmp_path, i["file"])) for i in manifest["shards"].values()]
+    docs_size = sum(os.path.getsize(os.path.join(tmp_path, name)) for name in doc_files(manifest))
+    database_size = len(json.dumps(entries, ensure_ascii=False).encode("utf-8"))
+    print(f"\n{len(entries)} documents en {elapsed:.2f}s : shards {sum(shard_sizes) / 1e3:.0f} Ko "
+          f"(max {max(shard_sizes) / 1e3:.1f} Ko), documents {docs_size / 1e3:.0f} Ko, database.json {database_size / 1e3:.0f} Ko")
+
+    assert elapsed < 5.0
+    # Chaque document n'est écrit qu'une fois : l'index complet reste de l'ordre de database.json
+    assert sum(shard_sizes) + docs_size < 1.5 * database_size
+    assert max(shard_sizes) < 64 * 1024
+
+
+def test_lines_index_version(tmp_path):
+    folder = tmp_path / "lyrics"
+    folder.mkdir()
+    (folder / "A - B.lrc").write_text("[00:01.00]Bonjour le monde\n", encoding="utf-8")
+    manifest = generate_db.build_lines_index([{"filename": "A - B.lrc"}], str(folder), str(tmp_path / "lines"))
+    assert manifest["version"] == generate_db.INDEX_VERSION
+    assert manifest["lines"] == 1
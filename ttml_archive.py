@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+import hashlib
+import os
+import sqlite3
+import time
+import zlib
+from threading import Lock
+
+DEFAULT_ARCHIVE_FILE = "ttml_archive.db"
+
+
+class TtmlArchive:
+    """Archive permanente (SQLite) des TTML bruts, compressés (zlib), indexée par (id catalogue, storefront).
+
+    Contrairement au cache des paroles, rien n'y expire : l'archive permet de
+    régénérer tous les formats (voir lyrics_export.py) sans interroger l'API.
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE_FILE, readonly=False):
+        self.path = path
+        self.lock = Lock()
+        if readonly:
+            self.conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True, check_same_thread=False)
+            return
+
+        folder = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS ttml (
+                song_id TEXT NOT NULL,
+                storefront TEXT NOT NULL,
+                name TEXT,
+                artist TEXT,
+                source TEXT,
+                digest TEXT NOT NULL,
+                data BLOB NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (song_id, storefront)
+            )""")
+        self.conn.commit()
+
+    def put(self, song, storefront, ttml, source):
+        """Archive le TTML d'une chanson. Ne réécrit rien si ce TTML est déjà archivé. Retourne True si écrit."""
+        digest = hashlib.sha1(ttml.encode('utf-8')).hexdigest()
+        attrs = song['attributes']
+        with self.lock:
+            row = self.conn.execute("SELECT digest FROM ttml WHERE song_id = ? AND storefront = ?",
+                                    (str(song['id']), storefront)).fetchone()
+            if row and row[0] == digest:
+                return False
+        data = zlib.compress(ttml.encode('utf-8'), 9)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO ttml (song_id, storefront, name, artist, source, digest, data, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (str(song['id']), storefront, attrs.get('name'), attrs.get('artistName'), source, digest, data, time.time()))
+            self.conn.commit()
+        return True
+
+    def get(self, song_id, storefront):
+        """Retourne le TTML archivé, ou None."""
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM ttml WHERE song_id = ? AND storefront = ?",
+                                    (str(song_id), storefront)).fetchone()
+        return zlib.decompress(row[0]).decode('utf-8') if row else None
+
+    def entries(self, storefront=None):
+        """Métadonnées de toutes les chansons archivées : liste de (id, storefront, titre, artiste, source)."""
+        query = "SELECT song_id, storefront, name, artist, source FROM ttml"
+        params = ()
+        if storefront:
+            query += " WHERE storefront = ?"
+            params = (storefront,)
+        with self.lock:
+            return self.conn.execute(query + " ORDER BY song_id, storefront", params).fetchall()
+
+    def iter_ttml(self, keys):
+        """Génère (id, storefront, ttml) pour une liste de clés (id, storefront)."""
+        for song_id, storefront in keys:
+            with self.lock:
+                row = self.conn.execute("SELECT data FROM ttml WHERE song_id = ? AND storefront = ?",
+                                        (song_id, storefront)).fetchone()
+            if row:
+                yield song_id, storefront, zlib.decompress(row[0]).decode('utf-8')
+
+    def stats(self):
+        """(nombre de chansons, taille compressée en octets)."""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM ttml").fetchone()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
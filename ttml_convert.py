@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+from xml.parsers import expat
+
+FEED_CHUNK = 64 * 1024  # Taille des morceaux envoyés au parseur incrémental
+
+
+_SECONDS = {}  # "SS.mmm" -> "SS.xx" : au plus 60000 valeurs distinctes à la milliseconde
+
+
+def format_lrc_time(time_str):
+    """Formate le temps pour LRC [mm:ss.xx]."""
+    if not time_str: return "00:00.00"
+    # Format attendu souvent HH:MM:SS.mmm ou MM:SS.mmm
+    parts = time_str.split(':')
+    try:
+        if len(parts) == 3: # HH:MM:SS.mmm
+            total_min = int(parts[0]) * 60 + int(parts[1])
+        elif len(parts) == 2: # MM:SS.mmm
+            total_min = int(parts[0])
+        else:
+            return time_str
+        seconds = _SECONDS.get(parts[-1])
+        if seconds is None:
+            seconds = f"{float(parts[-1]):05.2f}"
+            if len(_SECONDS) < 100000:
+                _SECONDS[parts[-1]] = seconds
+        return f"{total_min:02d}:{seconds}"
+    except ValueError:
+        return time_str
+
+
+_LOCAL_NAMES = {}
+
+
+def _local(name):
+    """Nom local d'un tag ou attribut ('namespace}p' -> 'p'), mémorisé : peu de noms distincts."""
+    local = _LOCAL_NAMES.get(name)
+    if local is None:
+        local = _LOCAL_NAMES[name] = name.rpartition('}')[2]
+    return local
+
+
+class _LrcBuilder:
+    """Handlers expat : construit les lignes LRC sans créer d'arbre ni d'éléments.
+
+    Reproduit la sémantique de l'ancien convertisseur (findall('.//p'), spans enfants
+    directs, itertext) à partir des seuls événements début/fin/texte.
+    """
+
+    def __init__(self):
+        self.lines = []         # (ligne, karaoké) prêtes à être émises
+        self.times = {}         # Un même timestamp revient souvent (début de ligne = début du 1er mot)
+        self.depth = 0          # Profondeur dans le <p> courant (0 = hors <p>)
+        self.span_depth = 0     # Profondeur dans le <span> enfant direct courant (0 = hors span)
+        self.begin = None
+        self.agent = ''
+        self.karaoke = False
+        self.text = []          # Tout le texte du <p> (itertext)
+        self.spans = []         # Texte des spans enfants directs, précédé de leur <temps>
+
+    def _time(self, value):
+        lrc_time = self.times.get(value)
+        if lrc_time is None:
+            lrc_time = self.times[value] = format_lrc_time(value)
+        return lrc_time
+
+    def start(self, name, attrs):
+        if self.depth:
+            self.depth += 1
+            if self.span_depth:
+                self.span_depth += 1
+            elif self.depth == 2 and _local(name) == 'span':
+                self.span_depth = 1
+                s_begin = attrs.get('begin')
+                if s_begin is not None:
+                    self.karaoke = True
+                    if s_begin:
+                        s_time = self.times.get(s_begin)
+                        if s_time is None:
+                            s_time = self.times[s_begin] = format_lrc_time(s_begin)
+                        self.spans.append(f"<{s_time}>")
+        elif _local(name) == 'p':
+            self.depth = 1
+            self.begin = None
+            self.agent = ''
+            for key, value in attrs.items():
+                local = _local(key)
+                if local == 'begin':
+                    self.begin = value
+                elif local == 'agent':
+                    self.agent = value
+
+    def end(self, name):
+        if not self.depth:
+            return
+        self.depth -= 1
+        if self.span_depth:
+            self.span_depth -= 1
+        if self.depth:
+            return
+
+        lrc_time = self._time(self.begin or '00:00.000')
+        prefix = f"{self.agent}: " if self.agent else "" # Espace ajouté après l'agent pour lisibilité
+        if self.karaoke:
+            self.lines.append((f"[{lrc_time}]{prefix}{''.join(self.spans)}", True))
+        else:
+            txt = "".join(self.text).strip()
+            # Si c'est vide, parfois c'est une pause instrumentale, on l'ignore
+            if txt:
+                self.lines.append((f"[{lrc_time}]{prefix}{txt}", False))
+        self.karaoke = False
+        self.text = []
+        self.spans = []
+
+    def data(self, text):
+        if self.depth:
+            self.text.append(text)
+            if self.span_depth:
+                self.spans.append(text)
+
+
+def iter_lrc_lines(ttml):
+    """Génère (ligne LRC, karaoké) au fil de la lecture du TTML.
+
+    Parseur SAX (expat) avec gestion native des namespaces : aucun arbre n'est
+    construit, chaque ligne est émise dès la fermeture de son <p>.
+    Lève xml.parsers.expat.ExpatError si le document est invalide.
+    """
+    builder = _LrcBuilder()
+    parser = expat.ParserCreate(namespace_separator='}')
+    parser.buffer_text = True
+    parser.StartElementHandler = builder.start
+    parser.EndElementHandler = builder.end
+    parser.CharacterDataHandler = builder.data
+
+    for start in range(0, len(ttml), FEED_CHUNK):
+        parser.Parse(ttml[start:start + FEED_CHUNK], False)
+        if builder.lines:
+            yield from builder.lines
+            builder.lines = []
+    parser.Parse("", True)
+    yield from builder.lines
+
+
+def ttml_to_lrc(ttml):
+    """Convertit le XML TTML en format LRC. Retourne (lrc, karaoké) ou (None, False)."""
+    if not ttml: return None, False
+    try:
+        lines = []
+        is_karaoke = False
+        for line, karaoke in iter_lrc_lines(ttml):
+            lines.append(line)
+            is_karaoke = is_karaoke or karaoke
+        return "\n".join(lines), is_karaoke
+    except Exception as e:
+        print(f"❌ Erreur parsing XML: {e}")
+        return None, False
+
+
+def parse_seconds(value):
+    """Temps TTML ('HH:MM:SS.mmm', 'MM:SS.mmm', 'SS.mmm' ou '12.5s') -> secondes, None si absent ou invalide."""
+    if not value:
+        return None
+    try:
+        if value.endswith('s') and ':' not in value:
+            return float(value[:-1])
+        seconds = 0.0
+        for part in value.split(':'):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    except ValueError:
+        return None
+
+
+def lrc_timestamp(seconds):
+    """Secondes -> timestamp LRC 'mm:ss.xx' (arrondi au centième)."""
+    minutes, centiseconds = divmod(round(seconds * 100), 6000)
+    return f"{minutes:02d}:{centiseconds / 100:05.2f}"
+
+
+class _LineBuilder:
+    """Handlers expat : lignes structurées (timings de ligne et de mots) pour les exports autres que LRC."""
+
+    def __init__(self):
+        self.lines = []
+        self.depth = 0
+        self.span_depth = 0
+        self.line = None
+        self.text = []
+        self.word = None
+
+    def start(self, name, attrs):
+        if self.depth:
+            self.depth += 1
+            if self.span_depth:
+                self.span_depth += 1
+            elif self.depth == 2 and _local(name) == 'span':
+                self.span_depth = 1
+                self.word = {"begin": parse_seconds(attrs.get('begin')),
+                             "end": parse_seconds(attrs.get('end')), "text": []}
+        elif _local(name) == 'p':
+            self.depth = 1
+            self.line = {"begin": None, "end": None, "agent": "", "text": "", "words": []}
+            for key, value in attrs.items():
+                local = _local(key)
+                if local in ('begin', 'end'):
+                    self.line[local] = parse_seconds(value)
+                elif local == 'agent':
+                    self.line['agent'] = value
+
+    def end(self, name):
+        if not self.depth:
+            return
+        self.depth -= 1
+        if self.span_depth:
+            self.span_depth -= 1
+            if not self.span_depth:
+                word, self.word = self.word, None
+                word['text'] = ''.join(word['text']).strip()
+                if word['begin'] is not None and word['text']:
+                    self.line['words'].append(word)
+        if self.depth:
+            return
+        text = ' '.join(''.join(self.text).split())
+        if text:
+            self.line['text'] = text
+            if self.line['begin'] is None:
+                self.line['begin'] = 0.0
+            self.lines.append(self.line)
+        self.text = []
+
+    def data(self, text):
+        if self.depth:
+            self.text.append(text)
+            if self.word is not None:
+                self.word['text'].append(text)
+
+
+def parse_ttml(ttml):
+    """Lignes d'un TTML : [{begin, end, agent, text, words: [{begin, end, text}]}], temps en secondes.
+
+    end peut valoir None (absent du document). Lève xml.parsers.expat.ExpatError si le document est invalide.
+    """
+    builder = _LineBuilder()
+    parser = expat.ParserCreate(namespace_separator='}')
+    parser.buffer_text = True
+    parser.StartElementHandler = builder.start
+    parser.EndElementHandler = builder.end
+    parser.CharacterDataHandler = builder.data
+    parser.Parse(ttml, True)
+    return builder.lines
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+import json
+import os
+import time
+from itertools import chain
+
+DEFAULT_CHECKPOINT_FILE = "watch_checkpoint.json"
+DEFAULT_INTERVAL = 900   # Secondes entre deux vérifications
+MAX_RECENT = 500         # Derniers ajouts déjà traités gardés dans le point de reprise
+SOURCES = ('library', 'playlists', 'charts')
+DONE = ('ok', 'no_lyrics', 'skipped')  # Résultats qui rendent une chanson "vue" (les erreurs seront retentées)
+
+
+class WatchCheckpoint:
+    """Point de reprise du mode --watch (JSON, réécrit atomiquement après chaque source traitée).
+
+    - seen : ids catalogue déjà traités (avec ou sans paroles) ;
+    - recent : ids des derniers ajouts à la bibliothèque déjà parcourus ;
+    - playlists : date de dernière modification de chaque playlist ;
+    - synced : sources ayant déjà fait leur synchronisation complète initiale.
+    """
+
+    def __init__(self, path=DEFAULT_CHECKPOINT_FILE):
+        self.path = path
+        self.seen = set()
+        self.recent = []
+        self.playlists = {}
+        self.synced = set()
+        self.last_poll = None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.seen = set(data.get('seen', []))
+        self.recent = data.get('recent', [])
+        self.playlists = data.get('playlists', {})
+        self.synced = set(data.get('synced', []))
+        self.last_poll = data.get('last_poll')
+
+    def save(self):
+        data = {
+            'version': 1,
+            'last_poll': self.last_poll,
+            'synced': sorted(self.synced),
+            'playlists': self.playlists,
+            'recent': self.recent[-MAX_RECENT:],
+            'seen': sorted(self.seen)
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+class LyricsWatcher:
+    """Mode démon : garde la même session (et le même token) et ne traite que les nouveautés.
+
+    À chaque cycle, pour chaque source demandée :
+    - library : derniers ajouts à la bibliothèque (albums et playlists non encore parcourus),
+      précédés d'une synchronisation complète la toute première fois ;
+    - playlists : playlists nouvelles ou modifiées depuis le dernier cycle ;
+    - charts : entrées du classement jamais vues.
+    Seules les chansons dont l'id catalogue n'a jamais été vu sont passées à `process`
+    (process_track_list de apple_lyrics.py) ; une chanson n'est vue qu'une fois sauvegardée,
+    sans paroles ou déjà synchronisée (app.on_result) : les erreurs sont retentées au cycle
+    suivant. Un album ou une playlist dont la liste de pistes n'a pu être lue en entier n'est
+    pas marqué comme parcouru. Le point de reprise est enregistré après chaque source :
+    un redémarrage continue là où le démon s'était arrêté.
+    """
+
+    def __init__(self, app, process, checkpoint, sources=SOURCES, interval=DEFAULT_INTERVAL):
+        self.app = app
+        self.process = process
+        self.checkpoint = checkpoint
+        self.sources = sources
+        self.interval = interval
+        self.pending = set()  # Ids passés à process pendant la source en cours
+        self.done = set()     # Parmi eux, ceux traités sans erreur : vus une fois la source terminée
+        app.on_result = self._on_result
+
+    def _on_result(self, song_id, status):
+        # Appelé depuis les workers de téléchargement (set.add est atomique)
+        if status in DONE:
+            self.done.add(str(song_id))
+
+    def unseen(self, tracks):
+        """Génère les pistes dont l'id catalogue n'a jamais été vu (ni déjà rendu pendant cette source)."""
+        seen, pending = self.checkpoint.seen, self.pending
+        for track in tracks:
+            catalog_id = self.app.catalog_id(track)
+            if catalog_id is None or str(catalog_id) in seen or str(catalog_id) in pending:
+                continue
+            pending.add(str(catalog_id))
+            yield track
+
+    def _process(self, tracks, label):
+        """Passe les pistes jamais vues à process, s'il y en a."""
+        tracks = self.unseen(tracks)
+        first = next(tracks, None)
+        if first is not None:
+            self.process(chain([first], tracks), label)
+
+    def _library(self):
+        app, checkpoint = self.app, self.checkpoint
+        recent = app.get_recently_added()
+        if 'library' not in checkpoint.synced:
+            print("📂 Première synchronisation complète de la bibliothèque...")
+            songs = app.get_library_songs()
+            self._process(songs, "chansons")
+            if songs.failed:
+                raise RuntimeError("liste de la bibliothèque incomplète, synchronisation complète reprise au prochain cycle")
+            checkpoint.synced.add('library')
+            checkpoint.recent.extend(item['id'] for item in recent)
+            return
+
+        done = set(checkpoint.recent)
+        new_items = [item for item in recent if item['id'] not in done]
+        if not new_items:
+            return
+
+        listings = {
+            'library-albums': app.get_library_album_tracks,
+            'library-playlists': app.get_playlist_tracks,
+            'albums': app.get_catalog_album_tracks,
+        }
+        streams = {item['id']: listings[item['type']](item['id']) for item in new_items if item.get('type') in listings}
+
+        def tracks():
+            for stream in streams.values():
+                yield from stream
+
+        print(f"🆕 {len(new_items)} ajouts récents à la bibliothèque.")
+        self._process(tracks(), "nouvelles chansons")
+        # Un ajout dont la liste de pistes est incomplète sera reparcouru au prochain cycle
+        checkpoint.recent.extend(item['id'] for item in new_items
+                                 if item['id'] not in streams or not streams[item['id']].failed)
+
+    def _playlists(self):
+        app, checkpoint = self.app, self.checkpoint
+        changed = []
+        for playlist in app.get_user_playlists():
+            modified = playlist.get('attributes', {}).get('lastModifiedDate')
+            if modified is None or checkpoint.playlists.get(playlist['id']) != modified:
+                changed.append((playlist, modified))
+        if not changed:
+            return
+
+        streams = [(playlist, modified, app.get_playlist_tracks(playlist['id'])) for playlist, modified in changed]
+
+        def tracks():
+            for _, _, stream in streams:
+                yield from stream
+
+        print(f"🆕 {len(changed)} playlists nouvelles ou modifiées.")
+        self._process(tracks(), "nouvelles pistes")
+        for playlist, modified, stream in streams:
+            # Playlist lue en partie seulement : sa date n'est pas enregistrée, elle sera relue
+            if modified is not None and not stream.failed:
+                checkpoint.playlists[playlist['id']] = modified
+
+    def _charts(self):
+        tracks = list(self.unseen(self.app.get_charts(limit=100)))
+        if tracks:
+            print(f"🆕 {len(tracks)} nouvelles entrées dans les charts.")
+            self.process(tracks, "hits")
+
+    def poll(self):
+        """Un cycle : chaque source, suivie de l'enregistrement du point de reprise.
+
+        Une source en erreur n'enregistre que les chansons effectivement traitées :
+        son avancement (synchronisation complète, ajouts, dates des playlists) sera repris au cycle suivant.
+        """
+        # Session et token gardés d'un cycle à l'autre, renouvelés avant expiration
+        self.app.refresh_if_expiring()
+
+        before = len(self.checkpoint.seen)
+        for source in self.sources:
+            self.pending = set()
+            self.done = set()
+            try:
+                getattr(self, f"_{source}")()
+            except Exception as e:
+                print(f"❌ Mode watch, source {source} en erreur : {e}")
+            self.checkpoint.seen.update(self.done)
+            self.checkpoint.last_poll = time.time()
+            self.checkpoint.save()
+        if len(self.checkpoint.seen) == before:
+            print("💤 Rien de nouveau.")
+
+    def run(self):
+        """Boucle jusqu'à Ctrl+C."""
+        print(f"👀 Mode watch : {', '.join(self.sources)}, vérification toutes les {self.interval}s "
+              f"(point de reprise : {self.checkpoint.path}).")
+        try:
+            while True:
+                self.poll()
+                print(f"⏳ Prochaine vérification à {time.strftime('%H:%M:%S', time.localtime(time.time() + self.interval))}.")
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            print("\n👋 Mode watch arrêté.")
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import socket
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from threading import Event, Lock, Thread
+
+DEFAULT_QUEUE_FILE = "work_queue.db"
+DEFAULT_LEASE = 300      # Secondes pendant lesquelles une chanson réservée n'est pas redonnée à un autre worker
+MAX_ATTEMPTS = 3         # Réservations d'une chanson avant de l'abandonner ('failed')
+CLAIM_BATCH = 50         # Chansons réservées à la fois par un worker
+BUSY_TIMEOUT = 60        # Secondes d'attente du verrou d'écriture tenu par un autre processus
+DONE = ('ok', 'no_lyrics', 'skipped')
+
+
+def set_journal_mode(conn, network):
+    """Journal WAL pour une base locale, "rollback" (DELETE) pour une base sur un partage réseau.
+
+    Le WAL laisse lire pendant une écriture et ne synchronise le disque qu'aux checkpoints,
+    mais il repose sur une mémoire partagée entre processus d'une même machine et ne
+    fonctionne pas sur un partage réseau. Entre plusieurs machines, le partage (NFS, SMB)
+    doit respecter les verrous de fichiers POSIX/fcntl ; sinon, n'utiliser la base que
+    depuis une seule machine.
+    """
+    if network:
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.execute("PRAGMA synchronous=FULL")
+    else:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # Suffisant en WAL : une coupure ne perd que les derniers commits
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """File de travail partagée (SQLite) pour répartir un téléchargement entre processus ou machines.
+
+    Le planificateur (apple_lyrics.py --plan) y range les chansons à traiter ; chaque worker
+    (--worker) en réserve par lots sous un bail de `lease` secondes, prolongé tant qu'il tourne.
+    Une chanson terminée passe à 'ok' / 'no_lyrics', une erreur la remet en attente jusqu'à
+    MAX_ATTEMPTS réservations, puis 'failed'. Le bail d'un worker arrêté brutalement expire
+    et ses chansons sont reprises par les autres (les horloges des machines doivent être à
+    l'heure, à quelques secondes près face à la durée du bail).
+
+    La file sert à répartir le travail entre machines : elle est toujours ouverte en mode
+    partage réseau (voir set_journal_mode), ses écritures étant peu nombreuses.
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_FILE, worker_id=None, lease=DEFAULT_LEASE, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.worker_id = worker_id or default_worker_id()
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.lock = Lock()
+        folder = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        # Transactions explicites (BEGIN IMMEDIATE) : réservation atomique entre processus
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        set_journal_mode(self.conn, network=True)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                song_id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                artist TEXT NOT NULL,
+                album TEXT,
+                isrc TEXT,
+                hint TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                owner TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, lease_until)")
+
+    @contextmanager
+    def _transaction(self):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def add(self, songs, reset=False, batch=500):
+        """Ajoute des chansons ({'id', 'attributes': {...}, 'lyricsHint'}) à la file ; retourne le nombre de nouvelles.
+
+        Une chanson déjà présente est ignorée, sauf avec reset (--force) : elle est remise en attente
+        (et comptée), à moins d'être réservée par un worker.
+        """
+        added = 0
+        rows = []
+
+        def flush():
+            nonlocal added
+            now = time.time()
+            with self._transaction() as conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT INTO jobs (song_id, title, artist, album, isrc, hint, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(song_id) DO " + (
+                        "UPDATE SET status = 'pending', owner = NULL, lease_until = NULL, attempts = 0, "
+                        "hint = excluded.hint, updated_at = excluded.updated_at WHERE status != 'leased'" if reset else "NOTHING"),
+                    [row + (now,) for row in rows])
+                added += conn.total_changes - before
+            rows.clear()
+
+        for song in songs:
+            attrs = song['attributes']
+            rows.append((str(song['id']), attrs['name'], attrs['artistName'], attrs.get('albumName'), attrs.get('isrc'),
+                         song.get('lyricsHint')))
+            if len(rows) >= batch:
+                flush()
+        if rows:
+            flush()
+        return added
+
+    def claim(self, limit=CLAIM_BATCH):
+        """Réserve jusqu'à limit chansons (en attente, ou au bail expiré) pour ce worker.
+
+        Retourne des chansons au format de process_track_list ({'id', 'type', 'attributes'}), annotées
+        du lyricsHint trouvé par le planificateur s'il y en a un.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            # Bail expiré après la dernière tentative : le worker est mort sur cette chanson, on l'abandonne
+            conn.execute("UPDATE jobs SET status = 'failed', owner = NULL, updated_at = ? "
+                         "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?", (now, now, self.max_attempts))
+            rows = conn.execute(
+                "SELECT song_id, title, artist, album, isrc, hint FROM jobs "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_until < ?) ORDER BY rowid LIMIT ?",
+                (now, limit)).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET status = 'leased', owner = ?, lease_until = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE song_id = ?", [(self.worker_id, now + self.lease, now, row[0]) for row in rows])
+
+        songs = []
+        for song_id, title, artist, album, isrc, hint in rows:
+            attributes = {'name': title, 'artistName': artist}
+            if album:
+                attributes['albumName'] = album
+            if isrc:
+                attributes['isrc'] = isrc
+            song = {'id': song_id, 'type': 'songs', 'attributes': attributes}
+            if hint:
+                song['lyricsHint'] = hint
+            songs.append(song)
+        return songs
+
+    def renew(self):
+        """Prolonge le bail de toutes les chansons réservées par ce worker ; retourne leur nombre."""
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute("UPDATE jobs SET lease_until = ? WHERE status = 'leased' AND owner = ?",
+                                (now + self.lease, self.worker_id)).rowcount
+
+    def complete(self, song_id, status):
+        """Note le résultat d'une chanson réservée par ce worker ('ok', 'no_lyrics', 'skipped' ou 'error').
+
+        Sans effet si le bail a été perdu entre-temps (la chanson appartient alors à un autre worker).
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            if status in DONE:
+                conn.execute("UPDATE jobs SET status = ?, owner = NULL, lease_until = NULL, updated_at = ? "
+                             "WHERE song_id = ? AND status = 'leased' AND owner = ?",
+                             (status, now, str(song_id), self.worker_id))
+            else:
+                conn.execute("UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                             "owner = NULL, lease_until = NULL, updated_at = ? "
+                             "WHERE song_id = ? AND status = 'leased' AND owner = ?",
+                             (self.max_attempts, now, str(song_id), self.worker_id))
+
+    def release(self):
+        """Rend les chansons encore réservées par ce worker (exception en cours de traitement, arrêt) ;
+        retourne leur nombre. Elles repartent en attente, ou en 'failed' après MAX_ATTEMPTS réservations.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "owner = NULL, lease_until = NULL, updated_at = ? WHERE status = 'leased' AND owner = ?",
+                (self.max_attempts, now, self.worker_id)).rowcount
+
+    def claims(self, batch=CLAIM_BATCH):
+        """Génère les chansons réservées lot par lot, jusqu'à ce qu'il n'y ait plus rien à réserver."""
+        while True:
+            songs = self.claim(batch)
+            if not songs:
+                return
+            yield from songs
+
+    def wait(self, poll=5.0):
+        """Attend qu'une chanson soit de nouveau réservable ; retourne False quand la file est terminée.
+
+        Tant que d'autres workers ont des chansons réservées, rien n'est fini : si l'un d'eux
+        s'est arrêté, son bail expire et ses chansons redeviennent réservables ici.
+        """
+        announced = False
+        while True:
+            with self.lock:
+                ready, leased = self.conn.execute(
+                    "SELECT COALESCE(SUM(status = 'pending' OR (status = 'leased' AND lease_until < ?)), 0), "
+                    "COALESCE(SUM(status = 'leased'), 0) FROM jobs", (time.time(),)).fetchone()
+            if ready:
+                return True
+            if not leased:
+                return False
+            if not announced:
+                print(f"⏳ {leased} chansons réservées par d'autres workers : attente de leur fin (ou de l'expiration de leur bail)...")
+                announced = True
+            time.sleep(poll)
+
+    @contextmanager
+    def leases(self):
+        """Prolonge les baux de ce worker en arrière-plan, puis rend ceux qui restent en sortant."""
+        stop = Event()
+
+        def heartbeat():
+            while not stop.wait(self.lease / 3):
+                try:
+                    self.renew()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Prolongation des baux impossible. ({e})")
+
+        thread = Thread(target=heartbeat, daemon=True)
+        thread.start()
+        try:
+            yield self
+        finally:
+            stop.set()
+            thread.join()
+            released = self.release()
+            if released:
+                print(f"↩️ {released} chansons rendues à la file de travail.")
+
+    def stats(self):
+        """{statut: nombre de chansons} ; les baux expirés sont comptés à part ('expired')."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT CASE WHEN status = 'leased' AND lease_until < ? THEN 'expired' ELSE status END, COUNT(*) "
+                "FROM jobs GROUP BY 1", (time.time(),)).fetchall()
+        return dict(rows)
+
+    def workers(self):
+        """[(worker, chansons réservées, fin du bail)] des workers actifs."""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT owner, COUNT(*), MAX(lease_until) FROM jobs WHERE status = 'leased' AND lease_until >= ? "
+                "GROUP BY owner ORDER BY owner", (time.time(),)).fetchall()
+
+    def retry_failed(self):
+        """Remet les chansons 'failed' en attente ; retourne leur nombre."""
+        with self._transaction() as conn:
+            return conn.execute("UPDATE jobs SET status = 'pending', attempts = 0, updated_at = ? WHERE status = 'failed'",
+                                (time.time(),)).rowcount
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="État de la file de travail partagée (apple_lyrics.py --plan / --worker)")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE_FILE, help=f"File de travail (défaut: {DEFAULT_QUEUE_FILE})")
+    parser.add_argument("--retry-failed", action="store_true", help="Remettre en attente les chansons abandonnées")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.queue):
+        print(f"❌ File '{args.queue}' introuvable. Elle est remplie par apple_lyrics.py --plan.")
+        sys.exit(1)
+    queue = WorkQueue(args.queue)
+    try:
+        if args.retry_failed:
+            print(f"🔁 {queue.retry_failed()} chansons remises en attente.")
+        stats = queue.stats()
+        total = sum(stats.values())
+        print(f"📋 {total} chansons : " + ", ".join(f"{status} {n}" for status, n in sorted(stats.items())))
+        for owner, count, until in queue.workers():
+            print(f"👷 {owner} : {count} chansons réservées (bail jusqu'à {time.strftime('%H:%M:%S', time.localtime(until))})")
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()